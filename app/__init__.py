@@ -1,33 +1,68 @@
 # app/__init__.py
 from flask import Flask
-from flask_migrate import Migrate
 from .config import Config
 from .database import db, init_db
-from .routes.main import main_bp
-from .routes.api import api_bp
-from .routes.admin import admin_bp
-from .scheduler import init_scheduler
+import logging
 import sys
 import os
 
-migrate = Migrate()
+# Created only when a `flask db ...` command runs, so web workers, the
+# scheduler and other CLI commands never pull in Flask-Migrate / Alembic.
+migrate = None
+
+# Configured apps keyed by config class; create_app() is called from run.py,
+# the scheduler fallback and the flask CLI, and must only build each once.
+_apps = {}
+
+# `flask` group options that consume the following argument
+_FLASK_VALUE_OPTIONS = {'--app', '-A', '--env-file', '-e'}
+
+def _is_db_command():
+    """True when the process was started as `flask [options] db ...`."""
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in _FLASK_VALUE_OPTIONS:
+            next(args, None)
+        elif not arg.startswith('-'):
+            # First positional argument is the subcommand name
+            return arg == 'db'
+    return False
 
 def create_app(config_class=Config):
     """Application factory."""
+    global migrate
+
+    app = _apps.get(config_class)
+    if app is not None:
+        return app
+
+    # app.logger is the "app" package logger, so this also surfaces INFO from
+    # app.api_client / app.scheduler through Flask's handler; the root logger
+    # is left to the host process
+    logging.getLogger(__name__).setLevel(logging.INFO)
+
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(config_class)
 
     # init extensions
     db.init_app(app)
-    migrate.init_app(app, db)
 
-    # Initialize database with WAL mode and create tables
+    if _is_db_command():
+        if migrate is None:
+            from flask_migrate import Migrate
+            migrate = Migrate()
+        migrate.init_app(app, db)
+
+    # Initialize database with WAL mode (tables only if AUTO_CREATE_TABLES)
     init_db(app)
 
-    # register blueprints
-    app.register_blueprint(main_bp)
-    app.register_blueprint(api_bp, url_prefix="/api")
-    app.register_blueprint(admin_bp)
+    # register blueprints (view modules are imported on first request)
+    from .routes import make_blueprint, MAIN_ROUTES, API_ROUTES, ADMIN_ROUTES
+
+    app.register_blueprint(make_blueprint("main", MAIN_ROUTES))
+    app.register_blueprint(make_blueprint("api", API_ROUTES), url_prefix="/api")
+    if app.config.get('ADMIN_ENABLED', True):
+        app.register_blueprint(make_blueprint("admin", ADMIN_ROUTES, url_prefix="/admin"))
 
     # ===== REGISTER CLI COMMANDS =====
     register_cli_commands(app)
@@ -37,12 +72,14 @@ def create_app(config_class=Config):
         is_reloader_parent = app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
         
         if not is_reloader_parent:
+            from .scheduler import init_scheduler
             init_scheduler(app)
         else:
-            print("⏸️  Skipping scheduler in Flask reloader parent process", file=sys.stderr)
+            app.logger.info("Skipping scheduler in Flask reloader parent process")
     else:
-        print("⏸️  Scheduler disabled by config", file=sys.stderr)
+        app.logger.info("Scheduler disabled by config")
 
+    _apps[config_class] = app
     return app
 
 def register_cli_commands(app):
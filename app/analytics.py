@@ -1,18 +1,29 @@
  # app/analytics.py
 from __future__ import annotations
 
+import hashlib
+import heapq
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
-from difflib import SequenceMatcher  # ADD THIS
-from collections import defaultdict  # ADD THIS
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING
+from rapidfuzz import fuzz, process
 
-from sqlalchemy import func, distinct, case, literal, and_, or_
+from flask import current_app
+from sqlalchemy import func, distinct, case, and_, or_, select, union_all, literal, null, cast, Integer
 from sqlalchemy.orm import Session
 
-from .database import db
+from .cache import data_version, ttl_cached
+from .database import db, get_read_session
 from .models import SurveyResponse, BudgetProject2024, MinistryAgency
-from .data_cleaner import DataCleaner
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple
 
 
 # -------------------------
@@ -27,31 +38,97 @@ class AnalyticsWindow:
     @property
     def sqlite_datetime_expr(self) -> Any:
         # datetime('now', '-30 days')
-        return func.datetime("now", f"-{self.days} days")
+        return _sqlite_datetime_since(self.days)
+
+
+@lru_cache(maxsize=32)
+def _sqlite_datetime_since(days: int) -> Any:
+    # Windows are built fresh per call site, so cache on the day count itself.
+    return func.datetime("now", f"-{days} days")
+
+
+# (mapped class, attribute key) -> predicate; the expressions are immutable so
+# widgets can share one instance instead of rebuilding it per query.
+_NON_EMPTY_TEXT_CACHE: Dict[Tuple[Any, str], Any] = {}
 
 
 def _non_empty_text(col):
     """SQLite-friendly: checks a column is not NULL and not empty/whitespace."""
-    return and_(col.isnot(None), func.trim(col) != "")
+    cache_key = (getattr(col, "class_", None), col.key)
+    expr = _NON_EMPTY_TEXT_CACHE.get(cache_key)
+    if expr is None:
+        expr = _NON_EMPTY_TEXT_CACHE[cache_key] = and_(col.isnot(None), func.trim(col) != "")
+    return expr
+
+
+def _missing_text(col):
+    """Inverse of _non_empty_text: NULL, or empty/whitespace."""
+    return or_(col.is_(None), func.trim(col) == "")
+
+
+def _non_empty_json(col):
+    """JSON column holds a truthy value (as json.dumps stores it): not NULL, null, false, 0 or empty."""
+    return and_(col.isnot(None), func.trim(col).notin_(("", "null", "false", "0", "0.0", '""', "[]", "{}")))
 
 
 def _safe_int(x: Any) -> int:
+    # Aggregates come back as int/None almost always; skip the try for those.
+    if x.__class__ is int:
+        return x
+    if not x:
+        return 0
     try:
-        return int(x or 0)
-    except Exception:
+        return int(x)
+    except (TypeError, ValueError, OverflowError):
         return 0
 
 
 def _safe_float(x: Any) -> float:
+    if x.__class__ is float:
+        return x
+    if not x:
+        return 0.0
     try:
-        return float(x or 0.0)
-    except Exception:
+        return float(x)
+    except (TypeError, ValueError):
         return 0.0
 
+# data_version() restarts at 0 with the process; salting the dashboard ETag
+# keeps a pre-restart validator from matching a post-restart state
+_ETAG_SALT = os.urandom(8).hex()
+
+def _fallback_parent_ministry(mda_name: Optional[str]) -> Optional[str]:
+    return _mapped_parent_ministry(mda_name, data_version())
+
+
+@lru_cache(maxsize=4096)
+def _mapped_parent_ministry(mda_name: Optional[str], version: int) -> Optional[str]:
+    # The lookup queries ministry_agencies, so memoize it per data version
+    # (bumped on every commit) rather than once per row per widget.
+    # data_cleaner pulls in pandas, so only import it once a row actually
+    # needs the name-based ministry lookup.
+    from .data_cleaner import DataCleaner
+    _, parent_min = DataCleaner.map_mda_to_ministry(mda_name)
+    return parent_min
+
+
+_OTHER_AGENCIES = sys.intern("OTHER INDEPENDENT AGENCIES")
+
+
+def _parent_ministry_label(parent_min: Optional[str], mda_name: Optional[str]) -> str:
+    """Ministry name for a result row; interned since a handful repeat across every row."""
+    if not parent_min:
+        parent_min = _fallback_parent_ministry(mda_name)
+    return sys.intern(parent_min) if parent_min else _OTHER_AGENCIES
+
 # ========================================
 # ADD THESE NEW CLASSES AFTER HELPERS
 # ========================================
 
+# One or more trailing AgencyConsolidationRules.HQ_SUFFIXES (longest first)
+_HQ_SUFFIX_RE = re.compile(r'(?:\s*(?:- HEADQUARTERS|- HQTRS|- HQ|HEADQUARTERS|HQTRS|HQ))+\s*$')
+
+
 class AgencyConsolidationRules:
     """
     Rules for consolidating Ministry HQs with their parent ministry
@@ -79,11 +156,27 @@ class AgencyConsolidationRules:
         '- HQTRS', '- HQ', 'HQTRS', 'HQ', 'HEADQUARTERS', '- HEADQUARTERS',
     ]
     
+    # Every HQ_SUFFIXES entry contains one of these, so a substring test
+    # against them is equivalent to testing all six suffixes
+    HQ_MARKERS = ('HQ', 'HEADQUARTERS')
+    
     @classmethod
     def get_canonical_agency_code(cls, agency_code: str) -> str:
         """Get the canonical agency code (after consolidation)"""
         return cls.MINISTRY_HQ_CONSOLIDATION.get(agency_code, agency_code)
     
+    @classmethod
+    def canonical_agency_code_expr(cls, col):
+        """SQL counterpart of get_canonical_agency_code for use in GROUP BY."""
+        remaps = {
+            code: canonical
+            for code, canonical in cls.MINISTRY_HQ_CONSOLIDATION.items()
+            if code != canonical
+        }
+        if not remaps:
+            return col
+        return case(remaps, value=col, else_=col)
+    
     @classmethod
     def get_current_name(cls, agency_code: str) -> Optional[str]:
         """Get the current name for an agency (handles name changes)"""
@@ -92,6 +185,7 @@ class AgencyConsolidationRules:
         return None
     
     @classmethod
+    @lru_cache(maxsize=4096)
     def normalize_ministry_name(cls, name: str) -> str:
         """Normalize ministry name by removing HQ suffixes"""
         if not name:
@@ -100,9 +194,7 @@ class AgencyConsolidationRules:
         normalized = name.upper().strip()
         
         # Remove HQ suffixes
-        for suffix in cls.HQ_SUFFIXES:
-            if normalized.endswith(suffix):
-                normalized = normalized[:-len(suffix)].strip()
+        normalized = _HQ_SUFFIX_RE.sub('', normalized)
         
         normalized = normalized.replace('&', ' AND ')
         normalized = ' '.join(normalized.split())
@@ -116,19 +208,43 @@ class AgencyConsolidationRules:
             return True
         
         name_upper = agency_name.upper()
-        for suffix in cls.HQ_SUFFIXES:
-            if suffix in name_upper:
-                return True
-        
-        return False
+        return any(marker in name_upper for marker in cls.HQ_MARKERS)
 
 
 class ImprovedMinistryAgency:
     """Enhanced MinistryAgency operations with consolidation support"""
     
     @staticmethod
-    def find_agency_by_name_improved(name: str, threshold: float = 0.90) -> Optional[MinistryAgency]:
-        """Enhanced fuzzy matching with 90% threshold"""
+    def normalized_agency_choices() -> Dict[MinistryAgency, str]:
+        """Active agencies mapped to their normalized names (fuzzy match choices)"""
+        all_agencies = MinistryAgency.query.filter(
+            MinistryAgency.is_active == True
+        ).order_by(MinistryAgency.id).all()
+        
+        return {
+            agency: AgencyConsolidationRules.normalize_ministry_name(agency.agency_name)
+            for agency in all_agencies
+        }
+    
+    @staticmethod
+    def exact_name_index(choices: Dict[MinistryAgency, str]) -> Dict[str, MinistryAgency]:
+        """Upper-cased agency_name_normalized -> agency, first agency wins"""
+        index: Dict[str, MinistryAgency] = {}
+        for agency in choices:
+            if agency.agency_name_normalized:
+                index.setdefault(agency.agency_name_normalized.upper(), agency)
+        return index
+    
+    @staticmethod
+    def find_agency_by_name_improved(
+        name: str,
+        threshold: float = 0.90,
+        choices: Optional[Dict[MinistryAgency, str]] = None
+    ) -> Optional[MinistryAgency]:
+        """
+        Enhanced fuzzy matching with 90% threshold.
+        Pass `choices` (from normalized_agency_choices) when matching many names.
+        """
         if not name:
             return None
         
@@ -144,29 +260,71 @@ class ImprovedMinistryAgency:
             return exact_match
         
         # Fuzzy match
-        all_agencies = MinistryAgency.query.filter(
-            MinistryAgency.is_active == True
-        ).all()
+        if choices is None:
+            choices = ImprovedMinistryAgency.normalized_agency_choices()
         
-        best_match = None
-        best_score = threshold
+        best = process.extractOne(
+            normalized_search,
+            choices,
+            scorer=fuzz.ratio,
+            score_cutoff=threshold * 100
+        )
         
-        for agency in all_agencies:
-            agency_normalized = AgencyConsolidationRules.normalize_ministry_name(
-                agency.agency_name
-            )
-            
-            score = SequenceMatcher(
-                None, 
-                normalized_search, 
-                agency_normalized
-            ).ratio()
+        # extractOne on a mapping returns (choice, score, key)
+        return best[2] if best else None
+    
+    @staticmethod
+    def match_agency_names(
+        names: List[str],
+        choices: Dict[MinistryAgency, str],
+        threshold: float = 0.90
+    ) -> Dict[str, Optional[MinistryAgency]]:
+        """
+        Batch version of find_agency_by_name_improved.
+        Returns {name: agency or None} for each distinct name.
+        """
+        normalized = {
+            name: AgencyConsolidationRules.normalize_ministry_name(name)
+            for name in set(names) if name
+        }
+        
+        matches: Dict[str, Optional[MinistryAgency]] = {}
+        fuzzy_names = []
+        
+        # Exact hits come from a dict instead of one query per name
+        exact_index = ImprovedMinistryAgency.exact_name_index(choices)
+        
+        for name, normalized_search in normalized.items():
+            exact_match = exact_index.get(normalized_search)
             
-            if score > best_score:
-                best_score = score
-                best_match = agency
+            if exact_match:
+                matches[name] = exact_match
+            else:
+                fuzzy_names.append(name)
+        
+        if not fuzzy_names:
+            return matches
+        
+        if not choices:
+            matches.update(dict.fromkeys(fuzzy_names))
+            return matches
+        
+        # names x agencies score matrix; scores under the cutoff come back as 0
+        agencies = list(choices.keys())
+        scores = process.cdist(
+            [normalized[name] for name in fuzzy_names],
+            list(choices.values()),
+            scorer=fuzz.ratio,
+            score_cutoff=threshold * 100,
+            workers=-1
+        )
+        best = scores.argmax(axis=1)
         
-        return best_match
+        for i, name in enumerate(fuzzy_names):
+            j = best[i]
+            matches[name] = agencies[j] if scores[i, j] else None
+        
+        return matches
     
     @staticmethod
     def link_survey_responses(force_relink: bool = False) -> Dict[str, Any]:
@@ -187,11 +345,18 @@ class ImprovedMinistryAgency:
         fuzzy_matched = 0
         unmatched = []
         
+        # Normalize the candidate names once for the whole run
+        choices = ImprovedMinistryAgency.normalized_agency_choices()
+        
+        # Resolve each distinct MDA name once, fuzzy-scoring them as a batch
+        matches = ImprovedMinistryAgency.match_agency_names(
+            [response.mda_name for response in unlinked],
+            choices,
+            threshold=0.90
+        )
+        
         for response in unlinked:
-            agency = ImprovedMinistryAgency.find_agency_by_name_improved(
-                response.mda_name, 
-                threshold=0.90
-            )
+            agency = matches.get(response.mda_name)
             
             if agency:
                 response.ministry_agency_id = agency.id
@@ -199,7 +364,7 @@ class ImprovedMinistryAgency:
                 normalized_response = AgencyConsolidationRules.normalize_ministry_name(
                     response.mda_name
                 )
-                normalized_agency = AgencyConsolidationRules.normalize_ministry_name(
+                normalized_agency = choices.get(agency) or AgencyConsolidationRules.normalize_ministry_name(
                     agency.agency_name
                 )
                 
@@ -229,164 +394,188 @@ class ImprovedMinistryAgency:
 
 class AnalyticsBase:
     """Base class to share the db session, and small conveniences."""
+    # Window used for the shared per-MDA aggregate when a widget doesn't need one
+    DEFAULT_WINDOW_DAYS = 30
+
     def __init__(self, session: Optional[Session] = None):
-        self.session: Session = session or db.session
+        # Analytics only reads, so default to the reader pool
+        self.session: Session = session or get_read_session()
+        # Results are only shared through app.cache for the default session
+        self.cacheable = session is None
 
+    @ttl_cached(ttl=60)
+    def mda_base_aggregate(self, window_days: int) -> List[Any]:
+        """
+        One row per (parent_ministry, mda_name) with every column the per-MDA widgets use.
 
-# -------------------------
-# Activity / engagement analytics
-# -------------------------
+        latest responders, activity, evidence coverage and quality flags are all
+        derived from these rows, so the table is scanned once per window; the
+        `win_*` columns are conditional aggregates over the last `window_days`.
+        Called positionally so every widget shares one cache entry.
+        """
+        win = AnalyticsWindow(days=window_days).sqlite_datetime_expr
+        in_win = SurveyResponse.created_at >= win
 
-class ActivityAnalytics(AnalyticsBase):
-    def latest_responding_agencies(self, limit: int = 20) -> List[Dict[str, Any]]:
-        rows = (
-            self.session.query(
+        def win_count(cond):
+            return func.sum(case((and_(in_win, cond), 1), else_=0))
+
+        stmt = (
+            select(
                 SurveyResponse.parent_ministry.label("parent_ministry"),
                 SurveyResponse.mda_name.label("mda_name"),
+                # all-time
+                func.count(SurveyResponse.id).label("responses"),
                 func.max(SurveyResponse.created_at).label("latest_response_at"),
-                func.count(SurveyResponse.id).label("total_responses"),
+                func.sum(case((_non_empty_text(SurveyResponse.project_pictures), 1), else_=0)).label("with_pictures"),
+                func.sum(case((_non_empty_text(SurveyResponse.geolocations), 1), else_=0)).label("with_geo"),
+                func.sum(case((_non_empty_text(SurveyResponse.other_documents), 1), else_=0)).label("with_docs"),
+                func.sum(case((SurveyResponse.award_certificate.isnot(None), 1), else_=0)).label("with_award_cert"),
+                func.sum(case((SurveyResponse.job_completion_certificate.isnot(None), 1), else_=0)).label("with_jcc"),
+                func.sum(
+                    case(
+                        (
+                            func.coalesce(SurveyResponse.amount_utilized_2024, 0)
+                            > func.coalesce(SurveyResponse.amount_released_2024, 0),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ).label("utilized_gt_released"),
+                func.sum(case((SurveyResponse.ergp_code_clean.is_(None), 1), else_=0)).label("missing_ergp"),
+                func.sum(case((_missing_text(SurveyResponse.state), 1), else_=0)).label("missing_state"),
+                func.sum(case((_missing_text(SurveyResponse.lga), 1), else_=0)).label("missing_lga"),
+                func.sum(
+                    case(
+                        (
+                            and_(
+                                SurveyResponse.has_submitted_report == True,
+                                func.coalesce(SurveyResponse.project_appropriation_2024, 0) == 0,
+                            ),
+                            1,
+                        ),
+                        else_=0,
+                    )
+                ).label("submitted_missing_appropriation"),
+                # window
+                func.sum(case((in_win, 1), else_=0)).label("win_responses"),
+                func.count(distinct(case((in_win, SurveyResponse.ergp_code)))).label("win_unique_projects"),
+                win_count(SurveyResponse.is_draft == True).label("win_drafts"),
+                win_count(SurveyResponse.has_submitted_report == True).label("win_submitted"),
+                func.count(distinct(case((in_win, func.date(SurveyResponse.created_at))))).label("win_active_days"),
+                func.max(case((in_win, SurveyResponse.created_at))).label("win_latest_response_at"),
+                win_count(_non_empty_text(SurveyResponse.project_pictures)).label("win_with_pictures"),
+                win_count(_non_empty_text(SurveyResponse.geolocations)).label("win_with_geo"),
+                win_count(_non_empty_text(SurveyResponse.other_documents)).label("win_with_docs"),
+                win_count(SurveyResponse.award_certificate.isnot(None)).label("win_with_award_cert"),
+                win_count(SurveyResponse.job_completion_certificate.isnot(None)).label("win_with_jcc"),
             )
             .group_by(SurveyResponse.parent_ministry, SurveyResponse.mda_name)
-            .order_by(func.max(SurveyResponse.created_at).desc())
-            .limit(limit)
-            .all()
         )
+        return self.session.execute(stmt).all()
 
-        out: List[Dict[str, Any]] = []
-        for r in rows:
-            parent_min = r.parent_ministry
-            if not parent_min:
-                _, parent_min = DataCleaner.map_mda_to_ministry(r.mda_name)
-
-            out.append(
-                {
-                    "parent_ministry": parent_min or "OTHER INDEPENDENT AGENCIES",
-                    "mda_name": r.mda_name,
-                    "latest_response_at": r.latest_response_at.isoformat() if r.latest_response_at else None,
-                    "total_responses": _safe_int(r.total_responses),
-                }
-            )
-        return out
 
-    def activity_summary_by_mda(self, window_days: int = 30) -> List[Dict[str, Any]]:
-        win = AnalyticsWindow(days=window_days).sqlite_datetime_expr
+# -------------------------
+# Activity / engagement analytics
+# -------------------------
 
-        rows = (
-            self.session.query(
-                SurveyResponse.parent_ministry.label("parent_ministry"),
-                SurveyResponse.mda_name.label("mda_name"),
-                func.count(SurveyResponse.id).label("responses"),
-                func.count(distinct(SurveyResponse.ergp_code)).label("unique_projects"),
-                func.sum(case((SurveyResponse.is_draft == True, 1), else_=0)).label("drafts"),
-                func.sum(case((SurveyResponse.has_submitted_report == True, 1), else_=0)).label("submitted"),
-                func.count(distinct(func.date(SurveyResponse.created_at))).label("active_days"),
-                func.max(SurveyResponse.created_at).label("latest_response_at"),
-            )
-            .filter(SurveyResponse.created_at >= win)
-            .group_by(SurveyResponse.parent_ministry, SurveyResponse.mda_name)
-            .order_by(func.count(SurveyResponse.id).desc())
-            .all()
+class ActivityAnalytics(AnalyticsBase):
+    @ttl_cached(ttl=60)
+    def latest_responding_agencies(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._latest_responders(self.mda_base_aggregate(self.DEFAULT_WINDOW_DAYS), limit)
+
+    @classmethod
+    def _latest_responders(cls, rows: List[Any], limit: int) -> List[Dict[str, Any]]:
+        # Partial top-N over the aggregate rows; NULL timestamps last, as with SQL DESC
+        latest = heapq.nlargest(
+            limit,
+            rows,
+            key=lambda r: (r.latest_response_at is not None, r.latest_response_at or datetime.min),
         )
 
-        out: List[Dict[str, Any]] = []
-        for r in rows:
-            parent_min = r.parent_ministry
-            if not parent_min:
-                _, parent_min = DataCleaner.map_mda_to_ministry(r.mda_name)
-
-            responses = _safe_int(r.responses)
-            submitted = _safe_int(r.submitted)
-
-            out.append(
-                {
-                    "parent_ministry": parent_min or "OTHER INDEPENDENT AGENCIES",
-                    "mda_name": r.mda_name,
-                    "responses_30d": responses,
-                    "unique_projects_30d": _safe_int(r.unique_projects),
-                    "drafts_30d": _safe_int(r.drafts),
-                    "submitted_30d": submitted,
-                    "submission_rate_pct_30d": round((submitted / responses) * 100, 2) if responses > 0 else 0.0,
-                    "active_days_30d": _safe_int(r.active_days),
-                    "latest_response_at": r.latest_response_at.isoformat() if r.latest_response_at else None,
-                }
+        return [
+            cls._latest_responder_row(r.parent_ministry, r.mda_name, r.latest_response_at, r.responses)
+            for r in latest
+        ]
+
+    @staticmethod
+    def _latest_responder_row(parent_ministry, mda_name, latest_response_at, total_responses) -> Dict[str, Any]:
+        return {
+            "parent_ministry": _parent_ministry_label(parent_ministry, mda_name),
+            "mda_name": mda_name,
+            "latest_response_at": latest_response_at.isoformat() if latest_response_at else None,
+            "total_responses": _safe_int(total_responses),
+        }
+
+    @ttl_cached(ttl=60)
+    def activity_summary_by_mda(self, window_days: int = 30) -> List[Dict[str, Any]]:
+        return self._activity_summary(self.mda_base_aggregate(window_days))
+
+    @classmethod
+    def _activity_summary(cls, rows: List[Any]) -> List[Dict[str, Any]]:
+        # Only MDAs with responses inside the window
+        windowed = sorted((r for r in rows if r.win_responses), key=lambda r: r.win_responses, reverse=True)
+
+        return [
+            cls._activity_summary_row(
+                r.parent_ministry, r.mda_name, r.win_responses, r.win_unique_projects, r.win_drafts,
+                r.win_submitted, r.win_active_days, r.win_latest_response_at,
             )
-        return out
+            for r in windowed
+        ]
+
+    @staticmethod
+    def _activity_summary_row(
+        parent_ministry, mda_name, responses, unique_projects, drafts, submitted, active_days, latest_response_at
+    ) -> Dict[str, Any]:
+        responses = _safe_int(responses)
+        submitted = _safe_int(submitted)
+
+        return {
+            "parent_ministry": _parent_ministry_label(parent_ministry, mda_name),
+            "mda_name": mda_name,
+            "responses_30d": responses,
+            "unique_projects_30d": _safe_int(unique_projects),
+            "drafts_30d": _safe_int(drafts),
+            "submitted_30d": submitted,
+            "submission_rate_pct_30d": round((submitted / responses) * 100, 2) if responses > 0 else 0.0,
+            "active_days_30d": _safe_int(active_days),
+            "latest_response_at": latest_response_at.isoformat() if latest_response_at else None,
+        }
 
+    @ttl_cached(ttl=60)
     def monthly_activity_summary(self) -> List[Dict[str, Any]]:
         """
         Returns daily response counts for the past 30 days.
         """
-        
-        # Get responses from the last 30 days
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        
-        rows = (
-            self.session.query(
-                func.date(SurveyResponse.updated).label("response_date"),
-                func.count(SurveyResponse.id).label("total_responses"),
-                func.sum(case((SurveyResponse.survey_type == "survey1", 1), else_=0)).label("survey1_count"),
-                func.sum(case((SurveyResponse.survey_type == "survey2", 1), else_=0)).label("survey2_count"),
-            )
-            .filter(SurveyResponse.updated >= thirty_days_ago)
-            .group_by(func.date(SurveyResponse.updated))
-            .order_by(func.date(SurveyResponse.updated))
-            .all()
-        )
-        
-        # Create a dict of dates with counts
-        activity_by_date = {}
-        for r in rows:
-            date_str = r.response_date.isoformat() if hasattr(r.response_date, 'isoformat') else str(r.response_date)
-            activity_by_date[date_str] = {
-                "date": date_str,
-                "total": _safe_int(r.total_responses),
-                "survey1": _safe_int(r.survey1_count),
-                "survey2": _safe_int(r.survey2_count),
-            }
-        
-        # Fill in missing dates with zero counts
-        result = []
-        for i in range(30):
-            date = (datetime.utcnow() - timedelta(days=29-i)).date()
-            date_str = date.isoformat()
-            
-            if date_str in activity_by_date:
-                result.append(activity_by_date[date_str])
-            else:
-                result.append({
-                    "date": date_str,
-                    "total": 0,
-                    "survey1": 0,
-                    "survey2": 0,
-                })
-        
-        return result
+        return self._daily_activity_summary(days=30)
 
+    @ttl_cached(ttl=60)
     def weekly_activity_summary(self) -> List[Dict[str, Any]]:
         """
         Returns daily response counts for the past 7 days.
         Useful for activity timeline charts.
         """
+        return self._daily_activity_summary(days=7)
+
+    def _daily_activity_summary(self, days: int) -> List[Dict[str, Any]]:
+        """Daily response counts for the last `days` days, zero-filled."""
+        now = datetime.utcnow()
         
-        # Get responses from the last 7 days
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        
-        rows = (
-            self.session.query(
+        stmt = (
+            select(
                 func.date(SurveyResponse.updated).label("response_date"),
                 func.count(SurveyResponse.id).label("total_responses"),
                 func.sum(case((SurveyResponse.survey_type == "survey1", 1), else_=0)).label("survey1_count"),
                 func.sum(case((SurveyResponse.survey_type == "survey2", 1), else_=0)).label("survey2_count"),
             )
-            .filter(SurveyResponse.updated >= seven_days_ago)
+            .where(SurveyResponse.updated >= now - timedelta(days=days))
             .group_by(func.date(SurveyResponse.updated))
             .order_by(func.date(SurveyResponse.updated))
-            .all()
         )
         
         # Create a dict of dates with counts
         activity_by_date = {}
-        for r in rows:
+        for r in self.session.execute(stmt):
             date_str = r.response_date.isoformat() if hasattr(r.response_date, 'isoformat') else str(r.response_date)
             activity_by_date[date_str] = {
                 "date": date_str,
@@ -395,78 +584,71 @@ class ActivityAnalytics(AnalyticsBase):
                 "survey2": _safe_int(r.survey2_count),
             }
         
-        # Fill in missing dates with zero counts
-        result = []
-        for i in range(7):
-            date = (datetime.utcnow() - timedelta(days=6-i)).date()
-            date_str = date.isoformat()
-            
-            if date_str in activity_by_date:
-                result.append(activity_by_date[date_str])
-            else:
-                result.append({
-                    "date": date_str,
-                    "total": 0,
-                    "survey1": 0,
-                    "survey2": 0,
-                })
-        
-        return result
+        # Fill in missing dates with zero counts (oldest first)
+        today = now.date()
+        date_strs = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+        return [
+            activity_by_date.get(date_str) or {"date": date_str, "total": 0, "survey1": 0, "survey2": 0}
+            for date_str in date_strs
+        ]
 
 # -------------------------
 # Data quality + evidence
 # -------------------------
 
 class QualityAnalytics(AnalyticsBase):
+    @ttl_cached(ttl=300)
     def evidence_coverage_by_mda(self, window_days: Optional[int] = None) -> List[Dict[str, Any]]:
-        q = self.session.query(
-            SurveyResponse.parent_ministry.label("parent_ministry"),
-            SurveyResponse.mda_name.label("mda_name"),
-            func.count(SurveyResponse.id).label("responses"),
-            func.sum(case((_non_empty_text(SurveyResponse.project_pictures), 1), else_=0)).label("with_pictures"),
-            func.sum(case((_non_empty_text(SurveyResponse.geolocations), 1), else_=0)).label("with_geo"),
-            func.sum(case((_non_empty_text(SurveyResponse.other_documents), 1), else_=0)).label("with_docs"),
-            func.sum(case((SurveyResponse.award_certificate.isnot(None), 1), else_=0)).label("with_award_cert"),
-            func.sum(case((SurveyResponse.job_completion_certificate.isnot(None), 1), else_=0)).label("with_jcc"),
-        )
+        if window_days is None:
+            return self._evidence_coverage(self.mda_base_aggregate(self.DEFAULT_WINDOW_DAYS), windowed=False)
+        return self._evidence_coverage(self.mda_base_aggregate(window_days), windowed=True)
 
-        if window_days is not None:
-            win = AnalyticsWindow(days=window_days).sqlite_datetime_expr
-            q = q.filter(SurveyResponse.created_at >= win)
-
-        rows = (
-            q.group_by(SurveyResponse.parent_ministry, SurveyResponse.mda_name)
-            .order_by(func.count(SurveyResponse.id).desc())
-            .all()
-        )
+    @classmethod
+    def _evidence_coverage(cls, rows: List[Any], windowed: bool) -> List[Dict[str, Any]]:
+        if windowed:
+            active = sorted((r for r in rows if r.win_responses), key=lambda r: r.win_responses, reverse=True)
+            return [
+                cls._evidence_coverage_row(
+                    r.parent_ministry, r.mda_name, r.win_responses, r.win_with_pictures, r.win_with_geo,
+                    r.win_with_docs, r.win_with_award_cert, r.win_with_jcc,
+                )
+                for r in active
+            ]
 
-        out: List[Dict[str, Any]] = []
-        for r in rows:
-            parent_min = r.parent_ministry
-            if not parent_min:
-                _, parent_min = DataCleaner.map_mda_to_ministry(r.mda_name)
-
-            responses = _safe_int(r.responses)
-            with_any_evidence = _safe_int(r.with_pictures) + _safe_int(r.with_geo) + _safe_int(r.with_docs)
-
-            out.append(
-                {
-                    "parent_ministry": parent_min or "OTHER INDEPENDENT AGENCIES",
-                    "mda_name": r.mda_name,
-                    "responses": responses,
-                    "with_pictures": _safe_int(r.with_pictures),
-                    "with_geo": _safe_int(r.with_geo),
-                    "with_docs": _safe_int(r.with_docs),
-                    "with_award_cert": _safe_int(r.with_award_cert),
-                    "with_jcc": _safe_int(r.with_jcc),
-                    "pct_with_pictures": round((_safe_int(r.with_pictures) / responses) * 100, 2) if responses else 0.0,
-                    "pct_with_geo": round((_safe_int(r.with_geo) / responses) * 100, 2) if responses else 0.0,
-                    "pct_with_docs": round((_safe_int(r.with_docs) / responses) * 100, 2) if responses else 0.0,
-                    "pct_with_any_evidence_proxy": round((with_any_evidence / responses) * 100, 2) if responses else 0.0,
-                }
+        return [
+            cls._evidence_coverage_row(
+                r.parent_ministry, r.mda_name, r.responses, r.with_pictures, r.with_geo,
+                r.with_docs, r.with_award_cert, r.with_jcc,
             )
-        return out
+            for r in sorted(rows, key=lambda r: r.responses, reverse=True)
+        ]
+
+    @staticmethod
+    def _evidence_coverage_row(
+        parent_ministry, mda_name, responses, with_pictures, with_geo, with_docs, with_award_cert, with_jcc
+    ) -> Dict[str, Any]:
+        responses = _safe_int(responses)
+        with_pictures = _safe_int(with_pictures)
+        with_geo = _safe_int(with_geo)
+        with_docs = _safe_int(with_docs)
+        with_any_evidence = with_pictures + with_geo + with_docs
 
+        return {
+            "parent_ministry": _parent_ministry_label(parent_ministry, mda_name),
+            "mda_name": mda_name,
+            "responses": responses,
+            "with_pictures": with_pictures,
+            "with_geo": with_geo,
+            "with_docs": with_docs,
+            "with_award_cert": _safe_int(with_award_cert),
+            "with_jcc": _safe_int(with_jcc),
+            "pct_with_pictures": round((with_pictures / responses) * 100, 2) if responses else 0.0,
+            "pct_with_geo": round((with_geo / responses) * 100, 2) if responses else 0.0,
+            "pct_with_docs": round((with_docs / responses) * 100, 2) if responses else 0.0,
+            "pct_with_any_evidence_proxy": round((with_any_evidence / responses) * 100, 2) if responses else 0.0,
+        }
+
+    @ttl_cached(ttl=300)
     def data_quality_flags_by_mda(self, limit: int = 200) -> List[Dict[str, Any]]:
         """
         Useful “red flags” you can surface:
@@ -475,62 +657,35 @@ class QualityAnalytics(AnalyticsBase):
         - missing state/LGA
         - missing financials when report submitted
         """
-        rows = (
-            self.session.query(
-                SurveyResponse.parent_ministry.label("parent_ministry"),
-                SurveyResponse.mda_name.label("mda_name"),
-                func.count(SurveyResponse.id).label("responses"),
-                func.sum(
-                    case(
-                        (
-                            func.coalesce(SurveyResponse.amount_utilized_2024, 0)
-                            > func.coalesce(SurveyResponse.amount_released_2024, 0),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                ).label("utilized_gt_released"),
-                func.sum(case((_non_empty_text(SurveyResponse.ergp_code) == False, 1), else_=0)).label("missing_ergp"),
-                func.sum(case((_non_empty_text(SurveyResponse.state) == False, 1), else_=0)).label("missing_state"),
-                func.sum(case((_non_empty_text(SurveyResponse.lga) == False, 1), else_=0)).label("missing_lga"),
-                func.sum(
-                    case(
-                        (
-                            and_(
-                                SurveyResponse.has_submitted_report == True,
-                                func.coalesce(SurveyResponse.project_appropriation_2024, 0) == 0,
-                            ),
-                            1,
-                        ),
-                        else_=0,
-                    )
-                ).label("submitted_missing_appropriation"),
-            )
-            .group_by(SurveyResponse.parent_ministry, SurveyResponse.mda_name)
-            .order_by(func.sum(case((_non_empty_text(SurveyResponse.ergp_code) == False, 1), else_=0)).desc())
-            .limit(limit)
-            .all()
-        )
+        return self._quality_flags(self.mda_base_aggregate(self.DEFAULT_WINDOW_DAYS), limit)
 
-        out: List[Dict[str, Any]] = []
-        for r in rows:
-            parent_min = r.parent_ministry
-            if not parent_min:
-                _, parent_min = DataCleaner.map_mda_to_ministry(r.mda_name)
-
-            out.append(
-                {
-                    "parent_ministry": parent_min or "OTHER INDEPENDENT AGENCIES",
-                    "mda_name": r.mda_name,
-                    "responses": _safe_int(r.responses),
-                    "utilized_gt_released": _safe_int(r.utilized_gt_released),
-                    "missing_ergp": _safe_int(r.missing_ergp),
-                    "missing_state": _safe_int(r.missing_state),
-                    "missing_lga": _safe_int(r.missing_lga),
-                    "submitted_missing_appropriation": _safe_int(r.submitted_missing_appropriation),
-                }
+    @classmethod
+    def _quality_flags(cls, rows: List[Any], limit: int) -> List[Dict[str, Any]]:
+        flagged = heapq.nlargest(limit, rows, key=lambda r: _safe_int(r.missing_ergp))
+
+        return [
+            cls._quality_flags_row(
+                r.parent_ministry, r.mda_name, r.responses, r.utilized_gt_released, r.missing_ergp,
+                r.missing_state, r.missing_lga, r.submitted_missing_appropriation,
             )
-        return out
+            for r in flagged
+        ]
+
+    @staticmethod
+    def _quality_flags_row(
+        parent_ministry, mda_name, responses, utilized_gt_released, missing_ergp, missing_state, missing_lga,
+        submitted_missing_appropriation,
+    ) -> Dict[str, Any]:
+        return {
+            "parent_ministry": _parent_ministry_label(parent_ministry, mda_name),
+            "mda_name": mda_name,
+            "responses": _safe_int(responses),
+            "utilized_gt_released": _safe_int(utilized_gt_released),
+            "missing_ergp": _safe_int(missing_ergp),
+            "missing_state": _safe_int(missing_state),
+            "missing_lga": _safe_int(missing_lga),
+            "submitted_missing_appropriation": _safe_int(submitted_missing_appropriation),
+        }
 
 
 # -------------------------
@@ -543,93 +698,90 @@ class PerformanceAnalytics(AnalyticsBase):
     This replaces the old ComplianceMetrics in data_fetcher.py
     """
     
-    def calculate_mda_compliance_data(self) -> List[Dict[str, Any]]:
+    def _active_agencies_by_code(self) -> Dict[str, MinistryAgency]:
+        """Active agencies keyed by agency_code (first by id), loaded once per instance"""
+        agency_map = getattr(self, '_agency_map', None)
+        if agency_map is None:
+            agency_map = {}
+            for agency in self.session.query(MinistryAgency).filter(
+                MinistryAgency.is_active == True
+            ).order_by(MinistryAgency.id):
+                agency_map.setdefault(agency.agency_code, agency)
+            self._agency_map = agency_map
+        return agency_map
+    
+    def _project_counts_query(self):
         """
-        Calculate MDA compliance with Ministry HQ consolidation.
-        This is the primary compliance calculation method.
+        (canonical_code, expected, reported, total_submissions) per agency.
+        
+        Budget rows and linked survey rows are tagged and UNION ALL'd, so both
+        sides are aggregated in one GROUP BY instead of two queries / subqueries.
         """
-        # STEP 1: Get budget counts by canonical agency_code
-        budget_by_agency_raw = self.session.query(
-            BudgetProject2024.agency_code,
-            BudgetProject2024.code
-        ).filter(
+        # expected: distinct budget project codes per agency
+        budget_rows = select(
+            AgencyConsolidationRules.canonical_agency_code_expr(
+                BudgetProject2024.agency_code
+            ).label("canonical_code"),
+            BudgetProject2024.code.label("budget_code"),
+            null().label("ergp_code"),
+            literal(0).label("is_submission")
+        ).where(
             BudgetProject2024.agency_code.isnot(None),
             BudgetProject2024.agency_code != ''
-        ).distinct().all()
-        
-        # Group by canonical agency code (consolidating HQs)
-        canonical_budget_counts = defaultdict(set)
-        
-        for agency_code, ergp_code in budget_by_agency_raw:
-            canonical_code = AgencyConsolidationRules.get_canonical_agency_code(agency_code)
-            canonical_budget_counts[canonical_code].add(ergp_code)
-        
-        budget_lookup = {
-            code: len(ergp_codes) 
-            for code, ergp_codes in canonical_budget_counts.items()
-        }
+        )
         
-        # STEP 2: Get survey data grouped by canonical agency
-        survey_data_raw = self.session.query(
-            MinistryAgency.agency_code,
-            MinistryAgency.agency_name,
-            MinistryAgency.ministry_name,
-            SurveyResponse.ergp_code,
-            SurveyResponse.id
+        # reported / total_submissions: survey responses linked to an active agency
+        survey_rows = select(
+            AgencyConsolidationRules.canonical_agency_code_expr(
+                MinistryAgency.agency_code
+            ).label("canonical_code"),
+            null().label("budget_code"),
+            func.nullif(SurveyResponse.ergp_code, "").label("ergp_code"),
+            literal(1).label("is_submission")
+        ).select_from(
+            MinistryAgency
         ).join(
             SurveyResponse,
             SurveyResponse.ministry_agency_id == MinistryAgency.id
-        ).filter(
+        ).where(
             MinistryAgency.is_active == True
-        ).all()
-        
-        # Group by canonical agency code
-        canonical_survey_data = defaultdict(lambda: {
-            'reported_ergp': set(),
-            'total_submissions': 0,
-            'agency_name': None,
-            'ministry_name': None
-        })
-        
-        for agency_code, agency_name, ministry_name, ergp_code, response_id in survey_data_raw:
-            canonical_code = AgencyConsolidationRules.get_canonical_agency_code(agency_code)
-            
-            if ergp_code:
-                canonical_survey_data[canonical_code]['reported_ergp'].add(ergp_code)
-            
-            canonical_survey_data[canonical_code]['total_submissions'] += 1
-            
-            if not canonical_survey_data[canonical_code]['agency_name']:
-                current_name = AgencyConsolidationRules.get_current_name(canonical_code)
-                canonical_survey_data[canonical_code]['agency_name'] = (
-                    current_name or agency_name
-                )
-                canonical_survey_data[canonical_code]['ministry_name'] = ministry_name
+        )
+        
+        tagged = union_all(budget_rows, survey_rows).subquery()
+        
+        return select(
+            tagged.c.canonical_code,
+            func.count(distinct(tagged.c.budget_code)).label("expected"),
+            func.count(distinct(tagged.c.ergp_code)).label("reported"),
+            func.sum(tagged.c.is_submission).label("total_submissions")
+        ).group_by(
+            tagged.c.canonical_code
+        )
+    
+    @ttl_cached(ttl=300)
+    def calculate_mda_compliance_data(self) -> List[Dict[str, Any]]:
+        """
+        Calculate MDA compliance with Ministry HQ consolidation.
+        This is the primary compliance calculation method.
+        """
+        # STEP 1: Budget and survey counts by canonical agency_code (consolidating HQs)
+        project_counts = {
+            r.canonical_code: (_safe_int(r.expected), _safe_int(r.reported), _safe_int(r.total_submissions))
+            for r in self.session.execute(self._project_counts_query())
+        }
         
-        # STEP 3: Combine and calculate compliance
+        # STEP 2: Combine and calculate compliance
         compliance_data = []
-        all_canonical_codes = set(budget_lookup.keys()) | set(canonical_survey_data.keys())
+        active_agencies = self._active_agencies_by_code()
         
-        for canonical_code in all_canonical_codes:
-            agency = MinistryAgency.query.filter_by(
-                agency_code=canonical_code,
-                is_active=True
-            ).first()
-            
-            if not agency:
-                continue
-            
-            expected = budget_lookup.get(canonical_code, 0)
-            
-            survey_info = canonical_survey_data.get(canonical_code, {
-                'reported_ergp': set(),
-                'total_submissions': 0,
-                'agency_name': agency.agency_name,
-                'ministry_name': agency.ministry_name
-            })
+        # Codes with budget or survey data that map to an active agency
+        # (dict key views support set operations directly)
+        matched_codes = project_counts.keys() & active_agencies.keys()
+        
+        for canonical_code in matched_codes:
+            agency = active_agencies[canonical_code]
             
-            reported = len(survey_info['reported_ergp'])
-            total_subs = survey_info['total_submissions']
+            expected, reported, total_subs = project_counts[canonical_code]
             
             display_name = (
                 AgencyConsolidationRules.get_current_name(canonical_code) or 
@@ -660,91 +812,130 @@ class PerformanceAnalytics(AnalyticsBase):
         
         return compliance_data
     
+    @ttl_cached(ttl=300)
     def calculate_ministry_compliance_data(self) -> List[Dict[str, Any]]:
-        """Calculate ministry-level compliance (aggregated from MDA level)"""
-        mda_data = self.calculate_mda_compliance_data()
-        
-        ministry_stats = defaultdict(lambda: {
-            'expected': 0,
-            'reported': 0,
-            'total_submissions': 0,
-            'mda_count': 0,
-            'mdas': []
-        })
-        
-        for mda in mda_data:
-            ministry = mda['parent_ministry']
-            ministry_stats[ministry]['expected'] += mda['expected_projects']
-            ministry_stats[ministry]['reported'] += mda['reported_projects']
-            ministry_stats[ministry]['total_submissions'] += mda['total_submissions']
-            ministry_stats[ministry]['mda_count'] += 1
-            ministry_stats[ministry]['mdas'].append(mda['mda_name'])
-        
-        ministry_data = []
-        for ministry, stats in ministry_stats.items():
-            compliance_rate = 0.0
-            if stats['expected'] > 0:
-                compliance_rate = (stats['reported'] / stats['expected']) * 100
-            
-            ministry_data.append({
-                'ministry_name': ministry,
-                'mda_count': stats['mda_count'],
-                'expected_projects': stats['expected'],
-                'reported_projects': stats['reported'],
-                'total_responses': stats['total_submissions'],
-                'avg_completion': round(compliance_rate, 2),
-                'total_budget': 0  # TODO: Sum budgets if needed
-            })
+        """
+        Calculate ministry-level compliance (sum of the MDA-level figures).
+        Rolled up in SQL from the same per-agency counts as the MDA rows.
+        """
+        counts_sq = self._project_counts_query().subquery()
         
-        return sorted(ministry_data, key=lambda x: x['ministry_name'])
+        # One agency row per active code (lowest id), as in _active_agencies_by_code
+        first_agency_sq = select(
+            func.min(MinistryAgency.id).label("id")
+        ).where(
+            MinistryAgency.is_active == True
+        ).group_by(
+            MinistryAgency.agency_code
+        ).subquery()
+        
+        stmt = select(
+            MinistryAgency.ministry_name.label("ministry_name"),
+            func.count(MinistryAgency.id).label("mda_count"),
+            func.sum(counts_sq.c.expected).label("expected"),
+            func.sum(counts_sq.c.reported).label("reported"),
+            func.sum(counts_sq.c.total_submissions).label("total_submissions")
+        ).join(
+            first_agency_sq,
+            first_agency_sq.c.id == MinistryAgency.id
+        ).join(
+            # Only agencies with budget or survey data
+            counts_sq,
+            counts_sq.c.canonical_code == MinistryAgency.agency_code
+        ).group_by(
+            MinistryAgency.ministry_name
+        ).order_by(
+            MinistryAgency.ministry_name
+        )
+        
+        return [
+            self._ministry_compliance_row(
+                r.ministry_name,
+                _safe_int(r.mda_count),
+                _safe_int(r.expected),
+                _safe_int(r.reported),
+                _safe_int(r.total_submissions)
+            )
+            for r in self.session.execute(stmt)
+        ]
+    
+    @staticmethod
+    def _ministry_compliance_row(ministry, mda_count, expected, reported, total_submissions) -> Dict[str, Any]:
+        compliance_rate = 0.0
+        if expected > 0:
+            compliance_rate = (reported / expected) * 100
+        
+        return {
+            'ministry_name': ministry,
+            'mda_count': mda_count,
+            'expected_projects': expected,
+            'reported_projects': reported,
+            'total_responses': total_submissions,
+            'avg_completion': round(compliance_rate, 2),
+            'total_budget': 0  # TODO: Sum budgets if needed
+        }
     
     def get_mda_project_details(self, agency_code: str) -> List[Dict[str, Any]]:
         """Get detailed project list for a specific MDA"""
         canonical_code = AgencyConsolidationRules.get_canonical_agency_code(agency_code)
         
-        agency = MinistryAgency.query.filter_by(
-            agency_code=canonical_code,
-            is_active=True
-        ).first()
+        agency = self._active_agencies_by_code().get(canonical_code)
         
         if not agency:
             return []
         
-        # Get budget projects
-        budget_projects = BudgetProject2024.query.filter_by(
-            agency_code=canonical_code
-        ).all()
-        
-        # Get survey responses
-        survey_responses = self.session.query(
-            SurveyResponse
-        ).join(
-            MinistryAgency,
-            SurveyResponse.ministry_agency_id == MinistryAgency.id
-        ).filter(
-            MinistryAgency.agency_code == canonical_code
-        ).all()
+        # Budget projects with their matching survey responses in one query.
+        # Responses are matched through any agency row carrying this code.
+        agency_ids = select(MinistryAgency.id).where(MinistryAgency.agency_code == canonical_code)
+        # Only the columns the payload uses, so no ORM objects are built
+        stmt = select(
+            BudgetProject2024.id.label("budget_id"),
+            BudgetProject2024.code,
+            BudgetProject2024.project_name,
+            BudgetProject2024.appropriation,
+            SurveyResponse.id.label("response_id"),
+            SurveyResponse.public_id,
+            SurveyResponse.amount_released_2024,
+            SurveyResponse.amount_utilized_2024,
+            SurveyResponse.project_status
+        ).select_from(
+            BudgetProject2024
+        ).outerjoin(
+            SurveyResponse,
+            and_(
+                SurveyResponse.ergp_code == BudgetProject2024.code,
+                SurveyResponse.ministry_agency_id.in_(agency_ids)
+            )
+        ).where(
+            BudgetProject2024.agency_code == canonical_code
+        ).order_by(
+            BudgetProject2024.id,
+            SurveyResponse.id
+        )
         
-        reported_ergp = {resp.ergp_code: resp for resp in survey_responses if resp.ergp_code}
+        # One entry per budget project; the latest response for a code wins
+        budget_with_response = {}
+        for r in self.session.execute(stmt):
+            budget_with_response[r.budget_id] = r
         
         project_details = []
         
-        for budget_proj in budget_projects:
-            reported_response = reported_ergp.get(budget_proj.code)
-            
+        for r in budget_with_response.values():
+            reported = r.response_id is not None
             project_details.append({
-                'project_code': budget_proj.code,
-                'project_title': budget_proj.project_name,
-                'budget_allocation': float(budget_proj.appropriation) if budget_proj.appropriation else 0,
-                'reported': reported_response is not None,
-                'submission_id': reported_response.public_id if reported_response else None,
-                'amount_released': float(reported_response.amount_released_2024) if reported_response and reported_response.amount_released_2024 else 0,
-                'amount_utilized': float(reported_response.amount_utilized_2024) if reported_response and reported_response.amount_utilized_2024 else 0,
-                'project_status': reported_response.project_status if reported_response else None
+                'project_code': r.code,
+                'project_title': r.project_name,
+                'budget_allocation': float(r.appropriation) if r.appropriation else 0,
+                'reported': reported,
+                'submission_id': r.public_id if reported else None,
+                'amount_released': float(r.amount_released_2024) if r.amount_released_2024 else 0,
+                'amount_utilized': float(r.amount_utilized_2024) if r.amount_utilized_2024 else 0,
+                'project_status': r.project_status if reported else None
             })
         
         return project_details
     
+    @ttl_cached(ttl=300)
     def mda_performance_table(self) -> List[Dict[str, Any]]:
         """
         Enhanced performance table that uses the new compliance calculation.
@@ -753,87 +944,91 @@ class PerformanceAnalytics(AnalyticsBase):
         # Get compliance data (already calculates expected/reported correctly)
         compliance_data = self.calculate_mda_compliance_data()
         
+        # Same active agencies calculate_mda_compliance_data matched against
+        agencies_by_code = self._active_agencies_by_code()
+        
+        # Per-agency response counts, aggregated in SQL. The rates are derived
+        # in Python below with the same arithmetic and round() as the old
+        # per-row loop, so the figures don't drift by SQLite's ROUND/avg.
+        # Evidence columns count when truthy, as the loop tested them
+        # (whitespace-only geolocations included).
+        geolocations = SurveyResponse.geolocations
+        completion = func.nullif(SurveyResponse.percentage_completed, 0)
+        stats_stmt = select(
+            SurveyResponse.ministry_agency_id.label("agency_id"),
+            func.count(SurveyResponse.id).label("total_responses"),
+            func.sum(case((SurveyResponse.has_submitted_report == True, 1), else_=0)).label("submitted"),
+            # sum()/count() skip NULLs; nullif drops 0 to match the truthiness filter
+            func.sum(completion).label("completion_total"),
+            func.count(completion).label("completion_count"),
+            (
+                func.sum(case((_non_empty_json(SurveyResponse.project_pictures), 1), else_=0))
+                + func.sum(case((and_(geolocations.isnot(None), geolocations != ""), 1), else_=0))
+                + func.sum(case((_non_empty_json(SurveyResponse.other_documents), 1), else_=0))
+            ).label("evidence_hits"),
+            func.max(SurveyResponse.created_at).label("latest_response_at"),
+            # Whole days since the latest response (created_at is stored as UTC)
+            cast(
+                func.julianday("now") - func.julianday(func.max(SurveyResponse.created_at)), Integer
+            ).label("days_since_last_response")
+        ).where(
+            SurveyResponse.ministry_agency_id.isnot(None)
+        ).group_by(
+            SurveyResponse.ministry_agency_id
+        )
+        stats_by_agency = {r.agency_id: r for r in self.session.execute(stats_stmt)}
+        
         # Now enhance with additional performance metrics
         performance_data = []
+        append = performance_data.append
+        iso = datetime.isoformat
+        compliance_fields = itemgetter(
+            'parent_ministry', 'mda_name', 'agency_code', 'expected_projects', 'reported_projects', 'compliance_rate_pct'
+        )
         
         for mda in compliance_data:
-            agency_code = mda['agency_code']
+            parent_ministry, mda_name, agency_code, expected, reported, compliance_pct = compliance_fields(mda)
             
             # Get additional metrics for this MDA
-            agency = MinistryAgency.query.filter_by(agency_code=agency_code).first()
+            agency = agencies_by_code.get(agency_code)
             
             if not agency:
                 continue
             
-            # Get survey responses for performance metrics
-            responses = SurveyResponse.query.filter_by(
-                ministry_agency_id=agency.id
-            ).all()
-            
-            total_responses = len(responses)
-            submitted_count = sum(1 for r in responses if r.has_submitted_report)
-            
-            completion_scores = [
-                float(r.percentage_completed) 
-                for r in responses 
-                if r.percentage_completed
-            ]
-            avg_completion_pct = (
-                sum(completion_scores) / len(completion_scores) 
-                if completion_scores else 0
-            )
-            
-            # Evidence metrics
-            with_pictures = sum(1 for r in responses if r.project_pictures)
-            with_geo = sum(1 for r in responses if r.geolocations)
-            with_docs = sum(1 for r in responses if r.other_documents)
+            stats = stats_by_agency.get(agency.id)
             
-            evidence_hits = with_pictures + with_geo + with_docs
-            evidence_rate_proxy = (
-                (evidence_hits / total_responses) * 100 
-                if total_responses > 0 else 0
-            )
-            
-            # Recency
-            latest_response_at = max(
-                (r.created_at for r in responses if r.created_at),
-                default=None
-            )
-            
-            days_since = None
-            recency_score_10 = 0.0
-            if latest_response_at:
-                days_since = int((datetime.utcnow() - latest_response_at).total_seconds() // 86400)
-                if days_since <= 3:
-                    recency_score_10 = 10.0
-                elif days_since <= 7:
-                    recency_score_10 = 7.0
-                elif days_since <= 14:
-                    recency_score_10 = 4.0
-            
-            # Submission rate
-            submission_rate_pct = (
-                (submitted_count / total_responses) * 100 
-                if total_responses > 0 else 0
-            )
-            
-            # Performance index (compliance-weighted)
-            performance_index = mda['compliance_rate_pct']  # Start with compliance
+            if stats is None:
+                total_responses = submission_pct = completion_pct = evidence_pct = 0
+                latest_response_at = days_since = None
+            else:
+                # Every group has at least one response, so total_responses > 0
+                total_responses = _safe_int(stats.total_responses)
+                submission_pct = round((_safe_int(stats.submitted) / total_responses) * 100, 2)
+                completion_count = _safe_int(stats.completion_count)
+                completion_pct = (
+                    round(_safe_int(stats.completion_total) / completion_count, 2)
+                    if completion_count else 0
+                )
+                evidence_pct = round((_safe_int(stats.evidence_hits) / total_responses) * 100, 2)
+                latest_response_at = stats.latest_response_at
+                days_since = stats.days_since_last_response
             
-            performance_data.append({
-                'parent_ministry': mda['parent_ministry'],
-                'mda_name': mda['mda_name'],
+            # Performance index (compliance-weighted) - compliance_rate_pct is
+            # already rounded to 2dp
+            append({
+                'parent_ministry': parent_ministry,
+                'mda_name': mda_name,
                 'agency_code': agency_code,
-                'expected_projects': mda['expected_projects'],
-                'reported_projects': mda['reported_projects'],
+                'expected_projects': expected,
+                'reported_projects': reported,
                 'total_responses': total_responses,
-                'compliance_rate_pct': mda['compliance_rate_pct'],
-                'submission_rate_pct': round(submission_rate_pct, 2),
-                'avg_completion_pct': round(avg_completion_pct, 2),
-                'evidence_rate_proxy_pct': round(evidence_rate_proxy, 2),
-                'latest_response_at': latest_response_at.isoformat() if latest_response_at else None,
+                'compliance_rate_pct': compliance_pct,
+                'submission_rate_pct': submission_pct,
+                'avg_completion_pct': completion_pct,
+                'evidence_rate_proxy_pct': evidence_pct,
+                'latest_response_at': iso(latest_response_at) if latest_response_at else None,
                 'days_since_last_response': days_since,
-                'performance_index': round(performance_index, 2),
+                'performance_index': compliance_pct,
             })
         
         return performance_data
@@ -846,42 +1041,49 @@ class PerformanceAnalytics(AnalyticsBase):
         min_expected_projects: int = 1,
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Returns best/worst agencies in a ministry"""
+        # mda_performance_table() is cached; only the top/bottom N are ranked
+        wanted = parent_ministry.strip().lower()
         rows = [
             r for r in self.mda_performance_table()
-            if (r.get("parent_ministry") or "").strip().lower() == parent_ministry.strip().lower()
+            if (r.get("parent_ministry") or "").strip().lower() == wanted
             and _safe_int(r.get("expected_projects")) >= min_expected_projects
         ]
         
-        rows_sorted = sorted(rows, key=lambda x: _safe_float(x.get("performance_index")), reverse=True)
+        score = lambda x: _safe_float(x.get("performance_index"))
         
         return {
-            "best": rows_sorted[:top_n],
-            "worst": list(reversed(rows_sorted[-top_n:])) if rows_sorted else [],
+            "best": heapq.nlargest(top_n, rows, key=score),
+            "worst": heapq.nsmallest(top_n, rows, key=score),
         }
     
+    @ttl_cached(ttl=600)
     def budget_reporting_overview(self) -> Dict[str, Any]:
         """Overall budget compliance summary"""
-        # Get total budget projects
-        total_budget_projects = (
-            self.session.query(func.count(distinct(BudgetProject2024.code)))
-            .scalar() or 0
-        )
+        # Total and reported budget projects in one statement; the correlated
+        # EXISTS lets SQLite probe idx_ergp_code instead of us shipping every
+        # reported code back in an IN (...) list
+        has_response = select(SurveyResponse.id).where(
+            SurveyResponse.ergp_code == BudgetProject2024.code,
+            func.trim(SurveyResponse.ergp_code) != ""
+        ).exists()
         
-        # Get reported codes
-        reported_codes = (
-            self.session.query(distinct(SurveyResponse.ergp_code))
-            .filter(SurveyResponse.ergp_code.isnot(None))
-            .filter(func.trim(SurveyResponse.ergp_code) != "")
-            .all()
-        )
-        reported_codes_set = {code[0] for code in reported_codes if code[0]}
+        # code is only unique per agency, so dedupe with GROUP BY code: it walks
+        # idx_code_ministry in order (no temp B-tree for COUNT(DISTINCT)) and
+        # runs the EXISTS probe once per code instead of once per row
+        per_code = select(
+            BudgetProject2024.code,
+            case((has_response, 1), else_=0).label("reported")
+        ).group_by(
+            BudgetProject2024.code
+        ).subquery()
         
-        # Count reported budget projects
-        reported_budget_projects = (
-            self.session.query(func.count(distinct(BudgetProject2024.code)))
-            .filter(BudgetProject2024.code.in_(reported_codes_set))
-            .scalar() or 0
-        )
+        counts = self.session.execute(select(
+            func.count().label("total"),
+            func.sum(per_code.c.reported).label("reported")
+        )).one()
+        
+        total_budget_projects = _safe_int(counts.total)
+        reported_budget_projects = _safe_int(counts.reported)
         
         unreported_projects = total_budget_projects - reported_budget_projects
         
@@ -896,6 +1098,30 @@ class PerformanceAnalytics(AnalyticsBase):
             "unreported_percentage": round(unreported_pct, 2),
         }
 
+# -------------------------
+# Dashboard (shared per-MDA scan)
+# -------------------------
+
+class DashboardAnalytics(AnalyticsBase):
+    @ttl_cached(ttl=60)
+    def mda_widget_summary(
+        self, window_days: int = 30, latest_limit: int = 20, flags_limit: int = 200
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        latest_responders, activity_30d, evidence_coverage and quality_flags in one pass.
+
+        All four are shaped from the same mda_base_aggregate() rows, fetched once
+        here so a non-cacheable session doesn't run the scan per widget.
+        """
+        rows = self.mda_base_aggregate(window_days)
+
+        return {
+            "latest_responders": ActivityAnalytics._latest_responders(rows, latest_limit),
+            "activity_30d": ActivityAnalytics._activity_summary(rows),
+            "evidence_coverage": QualityAnalytics._evidence_coverage(rows, windowed=True),
+            "quality_flags": QualityAnalytics._quality_flags(rows, flags_limit),
+        }
+
 # -------------------------
 # Facade for routes (single entry point)
 # -------------------------
@@ -904,22 +1130,81 @@ class AnalyticsService:
     """Facade for routes"""
     
     def __init__(self, session: Optional[Session] = None):
-        self.session = session or db.session
-        self.activity = ActivityAnalytics(self.session)
-        self.quality = QualityAnalytics(self.session)
-        self.performance = PerformanceAnalytics(self.session)
+        self.session = session or get_read_session()
+        self.own_session = session is not None
+        # Pass the caller's session through as-is so the default-session
+        # components stay cacheable
+        self.activity = ActivityAnalytics(session)
+        self.quality = QualityAnalytics(session)
+        self.performance = PerformanceAnalytics(session)
+        self.dashboard = DashboardAnalytics(session)
+    
+    # (payload key, component, method, kwargs) - independent read-only widgets
+    # The "mda_widgets" entry is expanded into latest_responders, activity_30d,
+    # evidence_coverage and quality_flags (one shared survey_responses scan).
+    DASHBOARD_WIDGETS = (
+        ("mda_widgets", "dashboard", "mda_widget_summary", {"window_days": 30, "latest_limit": 20, "flags_limit": 200}),
+        ("weekly_activity", "activity", "weekly_activity_summary", {}),
+        ("performance_table", "performance", "mda_performance_table", {}),
+        ("budget_reporting", "performance", "budget_reporting_overview", {}),
+    )
+    DASHBOARD_MAX_WORKERS = 4
+    
+    def dashboard_etag(self) -> str:
+        """
+        Validator for the dashboard payload: changes whenever the underlying
+        tables change, and at least hourly since the widgets use rolling windows.
+        
+        Commits in this process (including admin edits to budget rows, which
+        have no updated_at) move data_version(); the table stats catch
+        fetches and ingestion run from other processes.
+        """
+        survey = self.session.execute(select(
+            func.count(SurveyResponse.id),
+            func.max(SurveyResponse.updated_at)
+        )).one()
+        agencies = self.session.execute(select(
+            func.count(MinistryAgency.id),
+            func.max(MinistryAgency.updated_at)
+        )).one()
+        budget = self.session.execute(select(
+            func.count(BudgetProject2024.id),
+            func.max(BudgetProject2024.id)
+        )).one()
+        
+        state = (
+            _ETAG_SALT, data_version(),
+            tuple(survey), tuple(agencies), tuple(budget),
+            datetime.utcnow().strftime("%Y-%m-%dT%H")
+        )
+        return hashlib.sha1(repr(state).encode("utf-8")).hexdigest()
     
     def dashboard_overview(self) -> Dict[str, Any]:
         """Dashboard payload"""
-        return {
-            "latest_responders": self.activity.latest_responding_agencies(limit=20),
-            "activity_30d": self.activity.activity_summary_by_mda(window_days=30),
-            "weekly_activity": self.activity.weekly_activity_summary(),
-            "evidence_coverage": self.quality.evidence_coverage_by_mda(window_days=30),
-            "quality_flags": self.quality.data_quality_flags_by_mda(limit=200),
-            "performance_table": self.performance.mda_performance_table(),
-            "budget_reporting": self.performance.budget_reporting_overview(),
-        }
+        if self.own_session:
+            # A caller-supplied session can't be shared across threads
+            payload = {
+                key: getattr(getattr(self, component), method)(**kwargs)
+                for key, component, method, kwargs in self.DASHBOARD_WIDGETS
+            }
+        else:
+            # WAL lets the widget queries read concurrently; each worker gets its
+            # own app context and therefore its own scoped session.
+            app = current_app._get_current_object()
+            with ThreadPoolExecutor(max_workers=self.DASHBOARD_MAX_WORKERS) as pool:
+                futures = {
+                    key: pool.submit(_run_dashboard_widget, app, component, method, kwargs)
+                    for key, component, method, kwargs in self.DASHBOARD_WIDGETS
+                }
+                payload = {key: future.result() for key, future in futures.items()}
+
+        payload.update(payload.pop("mda_widgets"))
+        return payload
+    
+    def warm_cache(self) -> None:
+        """Precompute the cached dashboard/compliance results (run after ingestion)."""
+        self.dashboard_overview()
+        self.ministry_compliance()
     
     # ADD these new methods for compliance endpoints
     def mda_compliance(self) -> List[Dict[str, Any]]:
@@ -933,3 +1218,9 @@ class AnalyticsService:
     def mda_projects(self, agency_code: str) -> List[Dict[str, Any]]:
         """Project details for specific MDA"""
         return self.performance.get_mda_project_details(agency_code)
+
+
+def _run_dashboard_widget(app, component: str, method: str, kwargs: Dict[str, Any]) -> Any:
+    with app.app_context():
+        svc = AnalyticsService()
+        return getattr(getattr(svc, component), method)(**kwargs)
@@ -1,11 +1,62 @@
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+import httpx
 import json
-from typing import Dict, Any, Optional
+import logging
+from typing import Dict, Any, List, Optional
 from app.config import Config
 
+try:
+    # Optional: orjson decodes pages several times faster than the stdlib
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    # Optional: with h2 installed httpx negotiates HTTP/2 and multiplexes the
+    # concurrent page requests over one connection (HTTP/1.1 otherwise)
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    # Optional: uvloop's libuv event loop handles the concurrent sockets with
+    # less overhead than the default selector loop (uvloop.run needs >= 0.18)
+    from uvloop import run as _run_async
+except ImportError:
+    _run_async = asyncio.run
+
+# Transient failures are retried with exponential backoff (0.5s, 1s, 2s, ...),
+# honouring Retry-After on 429/503
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 60
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Shared empty default for missing page fields (never mutated)
+_EMPTY: Dict[str, Any] = {}
+
+logger = logging.getLogger(__name__)
+
 class APIClient:
     """Client for making API requests to survey endpoints"""
     
+    # One keep-alive requests.Session per survey type, shared by every instance
+    _sessions: Dict[str, requests.Session] = {}
+    # Configured clients handed out by for_survey()
+    _clients: Dict[str, 'APIClient'] = {}
+    
+    @classmethod
+    def for_survey(cls, survey_type: str = 'survey1') -> 'APIClient':
+        """Shared client for a survey type; config is only resolved once"""
+        client = cls._clients.get(survey_type)
+        if client is None:
+            client = cls._clients[survey_type] = cls(survey_type)
+        return client
+    
     def __init__(self, survey_type: str = 'survey1'):
         """
         Initialize API client for a specific survey type
@@ -31,9 +82,39 @@ class APIClient:
             self.organization_id = Config.SURVEY2_ORGANIZATION_ID
         else:
             raise ValueError(f"Invalid survey type: {self.survey_type}")
+        
+        # Built once; every page request reuses them
+        self._url = f"{self.base_url}{self.endpoint}"
+        self._headers = self._get_headers()
+        self._session = self._get_session()
+    
+    def _get_session(self) -> requests.Session:
+        """Pooled session for this survey type (auth headers set once)"""
+        session = self._sessions.get(self.survey_type)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=MAX_RETRIES,
+                    backoff_factor=BACKOFF_FACTOR,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset(['GET']),
+                    respect_retry_after_header=True
+                )
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(self._headers)
+            self._sessions[self.survey_type] = session
+        return session
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
+        # Accept-Encoding is left to requests/httpx: both already advertise
+        # gzip/deflate, plus br whenever the optional brotli package is
+        # installed, and only list encodings they can actually decode.
         return {
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/json',
@@ -51,61 +132,193 @@ class APIClient:
             
         Returns:
             API response as dictionary
+            
+        Raises:
+            requests.RequestException: once the session's retries are exhausted
         """
-        url = f"{self.base_url}{self.endpoint}"
-        
         params = {
             'limit': limit,
             'offset': offset
         }
         
         try:
-            response = requests.get(
-                url,
-                headers=self._get_headers(),
+            response = self._session.get(
+                self._url,
                 params=params,
                 timeout=Config.REQUEST_TIMEOUT
             )
             response.raise_for_status()
-            return response.json()
+            return _json_loads(response.content)
         except requests.exceptions.RequestException as e:
-            print(f"API returned error: {response.status_code} {response.text[:300]}")
-            return {'status': False, 'data': {'results': []}}
+            logger.error("API request failed for %s (offset=%d): %s", self.survey_type, offset, e)
+            raise
     
-    def fetch_all_responses(self) -> list:
+    def fetch_all_responses(self, start_offset: int = 0, max_results: Optional[int] = None) -> list:
         """
         Fetch all responses by handling pagination
         
+        Pages are requested concurrently (see _fetch_all_async); this is a
+        blocking wrapper so callers don't need an event loop.
+        
+        Args:
+            start_offset: Offset of the first record to fetch
+            max_results: Stop once this many records have been collected
+            
         Returns:
             List of all survey responses
         """
+        all_responses = _run_async(self._fetch_all_async(start_offset, max_results))
+        
+        logger.info("Total responses fetched from %s: %d", self.survey_type, len(all_responses))
+        return all_responses
+    
+    async def _fetch_all_async(self, start_offset: int = 0, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch pages FETCH_CONCURRENCY at a time over one pooled client.
+        
+        The first page is fetched on its own. If it reports the total `count`,
+        every remaining offset is known and requested at once; otherwise each
+        batch speculatively requests the following offsets, and pages past the
+        end come back empty and are ignored.
+        """
         all_responses = []
-        offset = 0
         limit = Config.PAGE_SIZE
+        concurrency = max(1, Config.FETCH_CONCURRENCY)
         
-        while True:
-            print(f"Fetching {self.survey_type} responses: offset={offset}, limit={limit}")
-            response_data = self.fetch_responses(offset, limit)
+        async with httpx.AsyncClient(
+            headers=self._headers,
+            http2=_HTTP2,
+            timeout=Config.REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        ) as client:
+            logger.debug("Fetching %s responses: offset=%d, limit=%d", self.survey_type, start_offset, limit)
+            first = await self._fetch_page_async(client, start_offset, limit)
+            if self._collect_pages([first], all_responses, max_results):
+                return all_responses
             
-            if not response_data.get('status'):
-                print(f"API returned error: {response_data.get('message', 'Unknown error')}")
-                break
+            total = (first.get('data') or _EMPTY).get('count')
+            # A short first page would leave a gap below the next offset
+            if isinstance(total, int) and len(all_responses) == limit:
+                end = total if max_results is None else min(total, start_offset + max_results)
+                offsets = range(start_offset + limit, end, limit)
+                logger.debug("Fetching %s responses: %d more pages of %d records", self.survey_type, len(offsets), total)
+                
+                # Pages land in their own slots as they complete, in any order
+                size = max(end - start_offset, len(all_responses))
+                all_responses.extend([None] * (size - len(all_responses)))
+                
+                # Queue here rather than in httpx's pool, whose pool timeout
+                # would otherwise start ticking for every page at once
+                semaphore = asyncio.Semaphore(concurrency)
+                
+                async def fetch(page_offset):
+                    async with semaphore:
+                        response_data = await self._fetch_page_async(client, page_offset, limit)
+                    if not response_data.get('status'):
+                        logger.error("API returned error: %s", response_data.get('message', 'Unknown error'))
+                        return 0
+                    results = (response_data.get('data') or _EMPTY).get('results') or ()
+                    start = page_offset - start_offset
+                    results = results[:size - start]
+                    all_responses[start:start + len(results)] = results
+                    return len(results)
+                
+                counts = await asyncio.gather(*(fetch(page_offset) for page_offset in offsets))
+                
+                # As in the sequential path, stop at the first failed or short page
+                for page_offset, count in zip(offsets, counts):
+                    start = page_offset - start_offset
+                    if count < min(limit, size - start):
+                        del all_responses[start + count:]
+                        break
+                return all_responses
             
-            data = response_data.get('data', {})
-            results = data.get('results', [])
+            offset = start_offset + limit
+            while True:
+                offsets = [offset + i * limit for i in range(concurrency)]
+                logger.debug("Fetching %s responses: offsets=%d..%d, limit=%d", self.survey_type, offsets[0], offsets[-1], limit)
+                pages = await asyncio.gather(
+                    *(self._fetch_page_async(client, page_offset, limit) for page_offset in offsets)
+                )
+                if self._collect_pages(pages, all_responses, max_results):
+                    break
+                
+                offset = offsets[-1] + limit
+        
+        return all_responses
+    
+    @staticmethod
+    def _collect_pages(pages: List[Dict[str, Any]], all_responses: list, max_results: Optional[int]) -> bool:
+        """
+        Append page results in offset order.
+        
+        Returns True once the fetch is finished: an error, an empty or last
+        page, or max_results reached.
+        """
+        extend = all_responses.extend
+        for response_data in pages:
+            get = response_data.get
+            if not get('status'):
+                logger.error("API returned error: %s", get('message', 'Unknown error'))
+                return True
+            
+            data = get('data') or _EMPTY
+            results = data.get('results')
             
             if not results:
-                break
+                return True
             
-            all_responses.extend(results)
+            extend(results)
             
-            # Check if there are more pages
-            next_url = data.get('next')
-            if not next_url:
-                break
+            if max_results is not None and len(all_responses) >= max_results:
+                # Trim excess (in case last page had more than we needed)
+                del all_responses[max_results:]
+                return True
             
-            # Update offset for next iteration
-            offset += limit
+            # Check if there are more pages
+            if not data.get('next'):
+                return True
         
-        print(f"Total responses fetched from {self.survey_type}: {len(all_responses)}")
-        return all_responses
+        return False
+    
+    async def _fetch_page_async(self, client: httpx.AsyncClient, offset: int, limit: int) -> Dict[str, Any]:
+        """
+        Async counterpart of fetch_responses, with the same retry policy.
+        
+        Raises httpx.HTTPError once retries are exhausted, so a failed page
+        aborts the fetch instead of silently truncating the result.
+        """
+        params = {
+            'limit': limit,
+            'offset': offset
+        }
+        
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await client.get(self._url, params=params)
+            except httpx.TransportError as e:
+                if attempt == MAX_RETRIES:
+                    logger.error("API request failed for %s (offset=%d): %s", self.survey_type, offset, e)
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    # Decode off the event loop so the other pages keep streaming
+                    return await asyncio.to_thread(_json_loads, response.content)
+                delay = self._retry_after(response) or self._backoff(attempt)
+            
+            logger.warning("Retrying %s offset=%d in %.1fs (attempt %d/%d)", self.survey_type, offset, delay, attempt + 1, MAX_RETRIES)
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(MAX_BACKOFF, BACKOFF_FACTOR * (2 ** attempt))
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Retry-After in seconds (delta-seconds form only), capped at MAX_BACKOFF"""
+        value = response.headers.get('Retry-After')
+        if value and value.strip().isdigit():
+            return min(MAX_BACKOFF, float(value))
+        return None
@@ -0,0 +1,78 @@
+# app/cache.py
+"""
+Small in-process TTL cache for analytics results.
+
+Every cached value is tagged with a data version that is bumped whenever a
+SQLAlchemy session commits in this process (fetches, ingestion, admin edits),
+so dashboard reads are served from memory until the data changes or the TTL
+runs out. Other processes writing to the same database are bounded by the TTL.
+"""
+import copy
+import threading
+import time
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+MAX_ENTRIES = 64
+
+_lock = threading.Lock()
+_entries = {}  # key -> (data_version, expires_at, value)
+_data_version = 0
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_data_version(session):
+    global _data_version
+    with _lock:
+        _data_version += 1
+        _entries.clear()
+
+
+def data_version():
+    """Current data version; changes after every commit in this process."""
+    return _data_version
+
+
+def clear():
+    """Drop every cached value."""
+    with _lock:
+        _entries.clear()
+
+
+def ttl_cached(ttl):
+    """
+    Cache a method's return value for `ttl` seconds, keyed on its arguments.
+
+    Instances with `cacheable = False` (e.g. analytics bound to a caller's own
+    session) always bypass the cache. Results are lists and dicts that callers
+    may mutate, so the cache keeps its own deep copy and hands out copies.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not getattr(self, 'cacheable', True):
+                return func(self, *args, **kwargs)
+
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+
+            with _lock:
+                version = _data_version
+                entry = _entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                return copy.deepcopy(entry[2])
+
+            value = func(self, *args, **kwargs)
+            stored = copy.deepcopy(value)
+
+            with _lock:
+                # Skip the store if a commit landed while we were computing
+                if version == _data_version:
+                    if key not in _entries and len(_entries) >= MAX_ENTRIES:
+                        _entries.pop(next(iter(_entries)))
+                    _entries[key] = (version, now + ttl, stored)
+            return value
+        return wrapper
+    return decorator
@@ -1,13 +1,28 @@
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+from sqlalchemy.pool import QueuePool
 
 # Get the base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-for _env_file in (BASE_DIR / '.env', BASE_DIR / '.flaskenv'):
-    if _env_file.exists():
-        load_dotenv(dotenv_path=_env_file, override=False)
+# Parse the .env files once per process. The guard is module state, not an
+# environment variable: the Werkzeug reloader child inherits os.environ and
+# must still read the files itself to see keys added since the parent started.
+_dotenv_loaded = False
+
+
+def _load_dotenv_files():
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    for env_file in (BASE_DIR / '.env', BASE_DIR / '.flaskenv'):
+        if env_file.exists():
+            load_dotenv(dotenv_path=env_file, override=False)
+    _dotenv_loaded = True
+
+
+_load_dotenv_files()
 
 class Config:
     # Critical for scheduler behavior
@@ -23,16 +38,38 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Run db.create_all() on every app start (dev convenience only).
+    # Schema changes otherwise go through `flask db upgrade`.
+    AUTO_CREATE_TABLES = os.getenv('AUTO_CREATE_TABLES', 'false').lower() in ['1', 'true', 'yes']
+
     # WAL and Conncurrent Access Settings
     SQLALCHEMY_ENGINE_OPTIONS = {
         'connect_args': {
             'timeout': 60,  # Increase timeout for busy database
             'check_same_thread': False,  # Allow multi-threaded access
         },
+        # SQLAlchemy 1.4 defaults file-based SQLite to NullPool (a new connection
+        # plus the PRAGMA hook on every checkout); keep a real pool instead.
+        'poolclass': QueuePool,
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
         'pool_pre_ping': True,  # Verify connections before using them
-        'pool_recycle': 3600,  # Recycle connections after 1 hour
+        'pool_recycle': 1800,  # Recycle connections after 30 minutes
         'echo': False,  # Set to True for SQL debugging
     }
+
+    # Separate pool for the dashboard's read-only analytics queries (see
+    # database.get_read_session), so they never queue behind fetch/ingest
+    # sessions holding connections in the default pool. Flask-SQLAlchemy does
+    # not apply SQLALCHEMY_ENGINE_OPTIONS to binds, so they are copied in here.
+    SQLALCHEMY_BINDS = {
+        'reader': {
+            **SQLALCHEMY_ENGINE_OPTIONS,
+            'url': SQLALCHEMY_DATABASE_URI,
+            'pool_size': int(os.getenv('READER_POOL_SIZE', str(os.cpu_count() or 4))),
+        },
+    }
     
     # API Configuration for Survey 1
     SURVEY1_BASE_URL = os.getenv('SURVEY1_BASE_URL')
@@ -49,11 +86,20 @@ class Config:
     # Request configuration
     REQUEST_TIMEOUT = 120
     PAGE_SIZE = 100  # Number of records per API call
+    FETCH_CONCURRENCY = int(os.getenv('FETCH_CONCURRENCY', '8'))  # Pages requested in parallel
+
+    # Directory for Parquet copies of ingested budget workbooks (needs pyarrow).
+    # Unset disables the cache.
+    BUDGET_CACHE_DIR = os.getenv('BUDGET_CACHE_DIR')
 
     # ====== Scheduler Settings ======
     SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() in ['1', 'true', 'yes']
     SCHEDULER_INTERVAL_HOURS = int(os.getenv('SCHEDULER_INTERVAL_HOURS', '1'))
     
+    # ====== Admin Interface ======
+    # The admin CRUD pages are not linked from the public dashboard
+    ADMIN_ENABLED = os.getenv('ADMIN_ENABLED', 'true').lower() in ['1', 'true', 'yes']
+
     # ====== Development/Production Flags ======
     # These help with environment detection
     ENV = os.getenv('FLASK_ENV', 'production')
\ No newline at end of file
@@ -3,12 +3,58 @@ import re
 import os
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, Optional, Tuple, List
-from collections import defaultdict
-from difflib import SequenceMatcher
+from collections import Counter, defaultdict
+from flask import current_app
+from rapidfuzz import fuzz, process
 from app.models import BudgetProject2024, MinistryAgency
-from app.database import db
+from app.database import db, begin_immediate
+
+
+@dataclass
+class AgencyReference:
+    """
+    Active MinistryAgency rows indexed for matching, loaded with one query so
+    matching a whole budget file never goes back to the database per row.
+    
+    Rows are flattened into parallel lists (normalized names, result dicts)
+    and the indexes hold positions in them, so matching never touches ORM
+    attributes. Lists keep id order, so "first" matches are the ones
+    .first() would return.
+    """
+    names: List[str] = field(default_factory=list)
+    infos: List[Dict[str, Any]] = field(default_factory=list)
+    by_code: Dict[str, int] = field(default_factory=dict)
+    by_name: Dict[str, int] = field(default_factory=dict)
+    by_ministry_name: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    by_ministry: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    ministry_names: Dict[str, List[str]] = field(default_factory=lambda: defaultdict(list))
+
+    @classmethod
+    def load(cls) -> 'AgencyReference':
+        reference = cls()
+        agencies = MinistryAgency.query.filter_by(is_active=True).order_by(MinistryAgency.id).all()
+        for i, agency in enumerate(agencies):
+            name = agency.agency_name_normalized or ''
+            reference.names.append(name)
+            reference.infos.append(DataCleaner._agency_info(agency))
+            reference.by_code.setdefault(agency.agency_code, i)
+            if name:
+                reference.by_name.setdefault(name, i)
+                reference.by_ministry_name.setdefault((agency.ministry_code, name), i)
+            reference.by_ministry[agency.ministry_code].append(i)
+            reference.ministry_names[agency.ministry_code].append(name)
+        return reference
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def info(self, i: int, **extra) -> Dict[str, Any]:
+        """Fresh result dict for agency `i`"""
+        return {**self.infos[i], **extra}
 
 
 class DataCleaner:
@@ -16,6 +62,20 @@ class DataCleaner:
     Handle data cleaning and normalization using MinistryAgency reference table
     """
     
+    # Rows per bulk_insert_mappings call during budget ingestion
+    INSERT_BATCH_SIZE = 5000
+    
+    # Match type prefixes in the order the ingestion summary lists them
+    MATCH_CATEGORY_ORDER = (
+        'EXACT_AGENCY_CODE_MATCH',
+        'EXACT_NAME_WITHIN_MINISTRY',
+        'EXACT_NAME_MATCH',
+        'FUZZY_WITHIN_MINISTRY_',
+        'FUZZY_MATCH_',
+        'NO_MATCH',
+        'NO_AGENCY_NAME',
+    )
+    
     @staticmethod
     def normalize_text(text: str) -> Optional[str]:
         """Consistent normalization with MinistryAgency"""
@@ -28,6 +88,7 @@ class DataCleaner:
         return normalized if normalized else None
     
     @staticmethod
+    @lru_cache(maxsize=8192)
     def normalize_agency_code(code: Any) -> Optional[str]:
         """
         Normalize agency codes to match GIFMIS database format.
@@ -52,25 +113,19 @@ class DataCleaner:
         return code_str if code_str else None
     
     @staticmethod
-    def extract_ministry_from_agency_code(agency_code: str) -> Optional[str]:
+    def normalize_agency_codes(codes: pd.Series) -> pd.Series:
         """
-        Extract ministry code from agency code.
-        Your agency codes are like: '215001001' where '215' is ministry
+        Column version of normalize_agency_code, using vectorized .str ops.
+        Empty / missing codes come back as None.
         """
-        if not agency_code:
-            return None
-        
-        # Ministry code is the first 1-3 digits
-        # Find where the ministry part ends (before the agency digits start)
-        if len(agency_code) >= 3:
-            # Try to get ministry code (first 3 digits max)
-            for i in range(min(3, len(agency_code)), 0, -1):
-                ministry_part = agency_code[:i]
-                # Check if this could be a valid ministry code
-                if MinistryAgency.query.filter_by(ministry_code=ministry_part).first():
-                    return ministry_part
-        
-        return None
+        codes = (
+            codes.astype('string').str.strip()
+            .str.replace(r'\.0$', '', regex=True)
+            .str.replace(r'\D', '', regex=True)
+            .str.lstrip('0')
+            .fillna('')
+        )
+        return codes.astype(object).where(codes.ne(''), None)
     
     @staticmethod
     def generate_agency_key(agency_code: str, agency_name: str) -> str:
@@ -80,7 +135,7 @@ class DataCleaner:
         normalized_code = DataCleaner.normalize_agency_code(agency_code)
         if normalized_code:
             return f"CODE_{normalized_code}"
-        elif agency_name and pd.notna(agency_name):
+        elif agency_name and agency_name == agency_name:  # NaN != NaN
             normalized = DataCleaner.normalize_text(str(agency_name))
             return f"NAME_{normalized}" if normalized else "UNKNOWN"
         return "UNKNOWN"
@@ -92,40 +147,51 @@ class DataCleaner:
         """
         print("🔍 Analyzing duplicates and grouping by agency...")
         
-        # Create agency key for grouping
-        df['agency_key'] = df.apply(
-            lambda row: DataCleaner.generate_agency_key(
-                row.get('agency_code'), 
-                row.get('agency')
-            ), 
-            axis=1
+        # Create agency key for grouping - same rules as generate_agency_key,
+        # but on whole columns (names are normalized once per distinct value)
+        if 'agency_code' in df.columns:
+            code_norm = DataCleaner.normalize_agency_codes(df['agency_code']).fillna('')
+        else:
+            code_norm = pd.Series('', index=df.index, dtype=object)
+        
+        if 'agency' in df.columns:
+            names = df['agency']
+            name_keys = {name: DataCleaner.normalize_text(str(name)) for name in names.dropna().unique()}
+            name_norm = names.map(name_keys)
+        else:
+            name_norm = pd.Series(None, index=df.index, dtype=object)
+        
+        df['agency_key'] = np.where(
+            code_norm.ne('').to_numpy(dtype=bool),
+            'CODE_' + code_norm,
+            np.where(name_norm.notna(), 'NAME_' + name_norm.fillna('').astype(str), 'UNKNOWN')
         )
         
-        # Group by code + agency_key
-        grouped = []
-        
-        for (code, agency_key), group in df.groupby(['code', 'agency_key']):
-            if len(group) > 1:
-                print(f"   Merging {len(group)} records for ERGP {code} - Agency: {agency_key}")
-            
-            # Create aggregated record
-            aggregated = {
-                'code': code,
-                'agency_key': agency_key,
-                'project_name': group['project_name'].iloc[0] if 'project_name' in group.columns else None,
-                'status_type': group['status_type'].iloc[0] if 'status_type' in group.columns else None,
-                'appropriation': group['appropriation'].sum(),
-                'ministry': group['ministry'].iloc[0] if 'ministry' in group.columns else None,
-                'agency': group['agency'].iloc[0] if 'agency' in group.columns else None,
-                'agency_code': group['agency_code'].iloc[0] if 'agency_code' in group.columns and pd.notna(group['agency_code'].iloc[0]) else None,
-                'ministry_code': group['ministry_code'].iloc[0] if 'ministry_code' in group.columns and pd.notna(group['ministry_code'].iloc[0]) else None,
-                'row_count': len(group),
-            }
-            
-            grouped.append(aggregated)
+        # Group by code + agency_key: sum appropriations, keep every descriptive
+        # column from the group's first row. agg('first') would skip missing
+        # values and pull a later row's name/ministry in instead.
+        keys = ['code', 'agency_key']
+        first_cols = ['project_name', 'status_type', 'ministry', 'agency', 'agency_code', 'ministry_code']
         
-        # Convert back to DataFrame
-        result_df = pd.DataFrame(grouped)
+        result_df = df.groupby(keys, as_index=False).agg(
+            appropriation=('appropriation', 'sum'),
+            row_count=('appropriation', 'size'),
+        )
+        present = [col for col in first_cols if col in df.columns]
+        if present:
+            first_rows = df.drop_duplicates(subset=keys, keep='first')[keys + present]
+            result_df = result_df.merge(first_rows, on=keys, how='left')
+        
+        # Missing values come back as None (not NaN / <NA>), ready for the DB
+        for col in first_cols:
+            if col not in result_df.columns:
+                result_df[col] = None
+            else:
+                result_df[col] = result_df[col].astype(object).where(result_df[col].notna(), None)
+        
+        merged = result_df.loc[result_df['row_count'] > 1, ['code', 'agency_key', 'row_count']]
+        for code, agency_key, row_count in merged.itertuples(index=False):
+            print(f"   Merging {row_count} records for ERGP {code} - Agency: {agency_key}")
         
         # Print summary
         original_count = len(df)
@@ -139,141 +205,232 @@ class DataCleaner:
         
         return result_df.drop(columns=['agency_key', 'row_count'], errors='ignore')
     
+    @staticmethod
+    def _agency_info(agency: MinistryAgency, **extra) -> Dict[str, Any]:
+        """GIFMIS fields reported for a matched agency"""
+        return {
+            'agency_code': agency.agency_code,
+            'agency_name': agency.agency_name,
+            'ministry_code': agency.ministry_code,
+            'ministry_name': agency.ministry_name,
+            'is_self_accounting': agency.is_self_accounting,
+            'is_parastatal': agency.is_parastatal,
+            **extra
+        }
+    
     @staticmethod
     def match_agency_to_gifmis(agency_name: str, agency_code: Optional[str] = None, 
-                               ministry_code: Optional[str] = None) -> Tuple[Optional[Dict], str]:
+                               ministry_code: Optional[str] = None,
+                               reference: Optional[AgencyReference] = None,
+                               global_fuzzy: bool = True) -> Tuple[Optional[Dict], str]:
         """
         Match agency to GIFMIS database with improved matching.
         Priority: Code matching > Ministry context > Exact name > Fuzzy
+        
+        Pass a preloaded AgencyReference when matching many rows; otherwise
+        one is loaded for this call. With global_fuzzy=False the last step is
+        skipped so callers can batch it through fuzzy_match_agencies.
         """
-        if not agency_name or pd.isna(agency_name):
+        # Rows from aggregate_duplicate_projects hold str or None; `x != x`
+        # still rejects a stray float NaN without a pandas call per row
+        if not agency_name or agency_name != agency_name:
             return None, "NO_AGENCY_NAME"
         
+        if reference is None:
+            reference = AgencyReference.load()
+        
         agency_name_str = str(agency_name)
         normalized_name = DataCleaner.normalize_text(agency_name_str)
         
         # ===== 1. PRIORITY: AGENCY CODE MATCHING =====
-        if agency_code and pd.notna(agency_code):
+        if agency_code:
+            # normalize_agency_code maps a float NaN to None
             normalized_code = DataCleaner.normalize_agency_code(agency_code)
             
             if normalized_code:
                 # Try exact agency code match
-                agency = MinistryAgency.query.filter_by(
-                    agency_code=normalized_code, 
-                    is_active=True
-                ).first()
+                i = reference.by_code.get(normalized_code)
                 
-                if agency:
-                    return {
-                        'agency_code': agency.agency_code,
-                        'agency_name': agency.agency_name,
-                        'ministry_code': agency.ministry_code,
-                        'ministry_name': agency.ministry_name,
-                        'is_self_accounting': agency.is_self_accounting,
-                        'is_parastatal': agency.is_parastatal
-                    }, "EXACT_AGENCY_CODE_MATCH"
+                if i is not None:
+                    return reference.info(i), "EXACT_AGENCY_CODE_MATCH"
         
         # ===== 2. MINISTRY CODE + NAME CONTEXT MATCHING =====
-        if ministry_code and pd.notna(ministry_code) and normalized_name:
+        if ministry_code and normalized_name:
             # Normalize ministry code (remove leading zeros)
             normalized_ministry_code = DataCleaner.normalize_agency_code(ministry_code)
             
             if normalized_ministry_code:
-                # Try to find agency within this ministry
-                agencies_in_ministry = MinistryAgency.query.filter(
-                    MinistryAgency.ministry_code == normalized_ministry_code,
-                    MinistryAgency.is_active == True
-                ).all()
-                
                 # First try exact name match within ministry
-                for agency in agencies_in_ministry:
-                    if agency.agency_name_normalized == normalized_name:
-                        return {
-                            'agency_code': agency.agency_code,
-                            'agency_name': agency.agency_name,
-                            'ministry_code': agency.ministry_code,
-                            'ministry_name': agency.ministry_name,
-                            'is_self_accounting': agency.is_self_accounting,
-                            'is_parastatal': agency.is_parastatal
-                        }, "EXACT_NAME_WITHIN_MINISTRY"
+                i = reference.by_ministry_name.get((normalized_ministry_code, normalized_name))
+                if i is not None:
+                    return reference.info(i), "EXACT_NAME_WITHIN_MINISTRY"
                 
-                # Then try fuzzy match within ministry
-                best_match = None
-                best_score = 0.0
-                
-                for agency in agencies_in_ministry:
-                    score = SequenceMatcher(
-                        None, 
-                        normalized_name, 
-                        agency.agency_name_normalized
-                    ).ratio()
-                    
-                    if score > best_score and score >= 0.85:  # Slightly lower threshold within ministry
-                        best_score = score
-                        best_match = agency
+                # Then try fuzzy match among this ministry's agencies
+                rows_in_ministry = reference.by_ministry.get(normalized_ministry_code, ())
+                names_in_ministry = reference.ministry_names.get(normalized_ministry_code, ())
+                # extractOne on a list returns (choice, score, index)
+                best = process.extractOne(
+                    normalized_name,
+                    names_in_ministry,
+                    scorer=fuzz.ratio,
+                    score_cutoff=85  # Slightly lower threshold within ministry
+                )
                 
-                if best_match:
-                    return {
-                        'agency_code': best_match.agency_code,
-                        'agency_name': best_match.agency_name,
-                        'ministry_code': best_match.ministry_code,
-                        'ministry_name': best_match.ministry_name,
-                        'is_self_accounting': best_match.is_self_accounting,
-                        'is_parastatal': best_match.is_parastatal,
-                        'similarity_score': best_score
-                    }, f"FUZZY_WITHIN_MINISTRY_{int(best_score*100)}%"
+                if best:
+                    return (
+                        reference.info(rows_in_ministry[best[2]], similarity_score=best[1] / 100),
+                        f"FUZZY_WITHIN_MINISTRY_{int(best[1])}%"
+                    )
         
         # ===== 3. GLOBAL EXACT NAME MATCHING =====
         if normalized_name:
-            agency_exact = MinistryAgency.query.filter(
-                MinistryAgency.agency_name_normalized == normalized_name,
-                MinistryAgency.is_active == True
-            ).first()
-            
-            if agency_exact:
-                return {
-                    'agency_code': agency_exact.agency_code,
-                    'agency_name': agency_exact.agency_name,
-                    'ministry_code': agency_exact.ministry_code,
-                    'ministry_name': agency_exact.ministry_name,
-                    'is_self_accounting': agency_exact.is_self_accounting,
-                    'is_parastatal': agency_exact.is_parastatal
-                }, "EXACT_NAME_MATCH"
+            i = reference.by_name.get(normalized_name)
+            
+            if i is not None:
+                return reference.info(i), "EXACT_NAME_MATCH"
         
         # ===== 4. GLOBAL FUZZY MATCHING =====
-        if normalized_name:
-            all_agencies = MinistryAgency.query.filter(
-                MinistryAgency.is_active == True
-            ).all()
-            
-            best_match = None
-            best_score = 0.0
-            
-            for agency in all_agencies:
-                score = SequenceMatcher(
-                    None, 
-                    normalized_name, 
-                    agency.agency_name_normalized
-                ).ratio()
-                
-                if score > best_score:
-                    best_score = score
-                    best_match = agency
-            
-            if best_match and best_score >= 0.90:
-                return {
-                    'agency_code': best_match.agency_code,
-                    'agency_name': best_match.agency_name,
-                    'ministry_code': best_match.ministry_code,
-                    'ministry_name': best_match.ministry_name,
-                    'is_self_accounting': best_match.is_self_accounting,
-                    'is_parastatal': best_match.is_parastatal,
-                    'similarity_score': best_score
-                }, f"FUZZY_MATCH_{int(best_score*100)}%"
+        if normalized_name and global_fuzzy:
+            best = process.extractOne(
+                normalized_name,
+                reference.names,
+                scorer=fuzz.ratio,
+                score_cutoff=90
+            )
+            
+            if best:
+                return (
+                    reference.info(best[2], similarity_score=best[1] / 100),
+                    f"FUZZY_MATCH_{int(best[1])}%"
+                )
         
         # ===== 5. NO MATCH =====
         return None, "NO_MATCH"
     
+    @staticmethod
+    def fuzzy_match_agencies(agency_names: List[Any], reference: AgencyReference,
+                             threshold: int = 90) -> List[Optional[Tuple[Dict, str]]]:
+        """
+        Batch version of the global fuzzy step of match_agency_to_gifmis.
+        Scores every name against every agency in one cdist call and returns
+        (agency_info, match_type) or None per name.
+        """
+        queries = [DataCleaner.normalize_text(str(name)) if name else None for name in agency_names]
+        results: List[Optional[Tuple[Dict, str]]] = [None] * len(queries)
+        
+        rows = [i for i, query in enumerate(queries) if query]
+        if not rows or not reference:
+            return results
+        
+        # names x agencies score matrix; scores under the cutoff come back as 0
+        scores = process.cdist(
+            [queries[i] for i in rows],
+            reference.names,
+            scorer=fuzz.ratio,
+            score_cutoff=threshold,
+            workers=-1
+        )
+        best = scores.argmax(axis=1)
+        
+        for k, i in enumerate(rows):
+            score = scores[k, best[k]]
+            if score:
+                results[i] = (
+                    reference.info(best[k], similarity_score=float(score) / 100),
+                    f"FUZZY_MATCH_{int(score)}%"
+                )
+        
+        return results
+    
+    @classmethod
+    def _match_category_rank(cls, category: str) -> Tuple[int, int]:
+        """Sort key for a match type: bucket, then higher fuzzy scores first"""
+        for rank, prefix in enumerate(cls.MATCH_CATEGORY_ORDER):
+            if category.startswith(prefix):
+                score = category[len(prefix):].rstrip('%')
+                return rank, -int(score) if score.isdigit() else 0
+        return len(cls.MATCH_CATEGORY_ORDER), 0
+    
+    @staticmethod
+    def _prepare_budget_records(match_results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[Any, str]]]:
+        """
+        Split matched rows into insertable mappings and (code, reason) skips.
+        
+        bulk_insert_mappings runs as one statement per batch, so rows that
+        budget_projects_2024 would reject (no ERGP code, no appropriation, or
+        a second row for the same code + agency_code under idx_unique_ergp_agency)
+        are filtered out here instead of failing the whole load.
+        """
+        columns = set(BudgetProject2024.__table__.columns.keys())
+        records = []
+        skipped = []
+        seen = set()
+        
+        for record in match_results:
+            code = record.get('code')
+            if not code:
+                skipped.append((code, "missing ERGP code"))
+                continue
+            
+            appropriation = record.get('appropriation')
+            if appropriation is None or appropriation != appropriation:
+                skipped.append((code, "missing appropriation"))
+                continue
+            
+            key = (code, record.get('agency_code') or 'NULL')
+            if key in seen:
+                skipped.append((code, f"duplicate of an earlier row for agency {key[1]}"))
+                continue
+            seen.add(key)
+            
+            # match_type (and anything else that isn't a column) is dropped
+            records.append({k: v for k, v in record.items() if k in columns})
+        
+        return records, skipped
+    
+    @staticmethod
+    def read_budget_file(file_path: str, cache_dir: Optional[str] = None) -> pd.DataFrame:
+        """
+        Load a budget CSV/Excel file with every column as strings.
+        
+        Workbooks are read with the Rust calamine engine when python-calamine
+        is installed. If `cache_dir` is given (BUDGET_CACHE_DIR) and pyarrow is
+        available, a Parquet copy keyed on the workbook's name, size and mtime
+        is kept there, so re-running an ingestion skips Excel parsing entirely.
+        """
+        if file_path.endswith('.csv'):
+            return pd.read_csv(file_path, dtype=str)
+        
+        cache_path = None
+        if cache_dir:
+            stat = os.stat(file_path)
+            cache_path = os.path.join(
+                cache_dir,
+                f"{os.path.basename(file_path)}.{stat.st_size}.{stat.st_mtime_ns}.parquet"
+            )
+            if os.path.exists(cache_path):
+                try:
+                    df = pd.read_parquet(cache_path)
+                    print(f"   Using cached copy: {cache_path}")
+                    # Parquet hands back None for empty cells; match read_excel's NaN
+                    return df.where(df.notna(), np.nan)
+                except (ImportError, OSError, ValueError) as e:
+                    print(f"   Ignoring cached copy {cache_path}: {e}")
+        
+        try:
+            df = pd.read_excel(file_path, dtype=str, engine='calamine')
+        except ImportError:
+            df = pd.read_excel(file_path, dtype=str)
+        
+        if cache_path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                df.to_parquet(cache_path, index=False)
+            except (ImportError, OSError, ValueError) as e:
+                print(f"   Not caching {file_path}: {e}")
+        
+        return df
+    
     @classmethod
     def ingest_and_normalize_budget_data(cls, file_path: str):
         """
@@ -286,10 +443,7 @@ class DataCleaner:
         
         try:
             # 1. Load data - read all as strings to preserve codes
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path, dtype=str)
-            else:
-                df = pd.read_excel(file_path, dtype=str)
+            df = cls.read_budget_file(file_path, current_app.config.get('BUDGET_CACHE_DIR'))
             
             print(f"   Loaded {len(df)} rows from file")
             print(f"   Actual columns: {', '.join(df.columns.tolist())}")
@@ -337,18 +491,19 @@ class DataCleaner:
             if dropped_count > 0:
                 print(f"   Dropped {dropped_count} rows with missing critical data")
             
-            # Clean text columns
+            # Clean text columns - the string dtype keeps missing values as <NA>
+            # (astype(str) turned them into the literal text 'nan')
             text_cols = ['code', 'project_name', 'status_type', 'ministry', 'agency', 'agency_code', 'ministry_code']
             for col in text_cols:
                 if col in df.columns:
-                    df[col] = df[col].astype(str).str.strip()
+                    df[col] = df[col].astype('string').str.strip()
             
             # Normalize codes
             if 'agency_code' in df.columns:
-                df['agency_code'] = df['agency_code'].apply(cls.normalize_agency_code)
+                df['agency_code'] = cls.normalize_agency_codes(df['agency_code'])
             
             if 'ministry_code' in df.columns:
-                df['ministry_code'] = df['ministry_code'].apply(cls.normalize_agency_code)
+                df['ministry_code'] = cls.normalize_agency_codes(df['ministry_code'])
             
             # Convert appropriation to numeric
             df['appropriation'] = pd.to_numeric(df['appropriation'], errors='coerce')
@@ -372,25 +527,47 @@ class DataCleaner:
             print("\n🔍 Matching agencies to GIFMIS database...")
             
             match_results = []
-            match_stats = defaultdict(int)
+            match_stats = Counter()
             unmatched_details = []
             
-            for idx, row in aggregated_df.iterrows():
-                agency_info, match_type = cls.match_agency_to_gifmis(
-                    row.get('agency'),
-                    row.get('agency_code'),
-                    row.get('ministry_code')
+            # Reference table is read once for the whole file
+            reference = AgencyReference.load()
+            print(f"   Loaded {len(reference)} active GIFMIS agencies")
+            
+            # Plain column arrays instead of iterrows(), which builds a Series
+            # per row (aggregate_duplicate_projects guarantees every column)
+            rows = list(zip(*(
+                aggregated_df[col].to_numpy() for col in (
+                    'code', 'project_name', 'status_type', 'appropriation',
+                    'ministry', 'agency', 'agency_code', 'ministry_code'
                 )
-                
+            )))
+            
+            # Code/ministry/exact matching per row; the global fuzzy step for
+            # whatever is left runs as one batch
+            matches = [
+                cls.match_agency_to_gifmis(agency, agency_code, ministry_code, reference, global_fuzzy=False)
+                for *_, agency, agency_code, ministry_code in rows
+            ]
+            
+            pending = [i for i, (agency_info, match_type) in enumerate(matches) if match_type == "NO_MATCH"]
+            if pending:
+                fuzzy = cls.fuzzy_match_agencies([rows[i][5] for i in pending], reference)
+                for i, match in zip(pending, fuzzy):
+                    if match:
+                        matches[i] = match
+            
+            for row, (agency_info, match_type) in zip(rows, matches):
+                code, project_name, status_type, appropriation, ministry, agency, agency_code, ministry_code = row
                 match_stats[match_type] += 1
                 
                 record = {
-                    'code': row['code'],
-                    'project_name': row.get('project_name'),
-                    'status_type': row.get('status_type'),
-                    'appropriation': float(row['appropriation']),
-                    'ministry_name': row.get('ministry'),
-                    'agency_name': row.get('agency'),
+                    'code': code,
+                    'project_name': project_name,
+                    'status_type': status_type,
+                    'appropriation': float(appropriation),
+                    'ministry_name': ministry,
+                    'agency_name': agency,
                 }
                 
                 # Add GIFMIS info if matched
@@ -406,19 +583,19 @@ class DataCleaner:
                 else:
                     # Use original data for unmatched
                     record.update({
-                        'ministry_code': row.get('ministry_code'),
-                        'agency_code': row.get('agency_code'),
-                        'agency_normalized': MinistryAgency.normalize_name(row.get('agency')),
+                        'ministry_code': ministry_code,
+                        'agency_code': agency_code,
+                        'agency_normalized': MinistryAgency.normalize_name(agency),
                         'match_type': match_type,
                     })
                     
                     # Log unmatched details
                     unmatched_details.append({
-                        'ergp_code': row['code'],
-                        'agency_name': row.get('agency'),
-                        'agency_code': row.get('agency_code'),
-                        'ministry_name': row.get('ministry'),
-                        'ministry_code': row.get('ministry_code'),
+                        'ergp_code': code,
+                        'agency_name': agency,
+                        'agency_code': agency_code,
+                        'ministry_name': ministry,
+                        'ministry_code': ministry_code,
                         'match_type': match_type,
                     })
                 
@@ -428,46 +605,13 @@ class DataCleaner:
             print(f"\n📊 GIFMIS Matching Results:")
             total_agencies = len(aggregated_df)
             
-            # Sort matches by quality
-            match_categories = [
-                'EXACT_AGENCY_CODE_MATCH',
-                'EXACT_NAME_WITHIN_MINISTRY',
-                'EXACT_NAME_MATCH',
-                'FUZZY_WITHIN_MINISTRY_100%',
-                'FUZZY_WITHIN_MINISTRY_99%',
-                'FUZZY_WITHIN_MINISTRY_98%',
-                'FUZZY_WITHIN_MINISTRY_97%',
-                'FUZZY_WITHIN_MINISTRY_96%',
-                'FUZZY_WITHIN_MINISTRY_95%',
-                'FUZZY_WITHIN_MINISTRY_94%',
-                'FUZZY_WITHIN_MINISTRY_93%',
-                'FUZZY_WITHIN_MINISTRY_92%',
-                'FUZZY_WITHIN_MINISTRY_91%',
-                'FUZZY_WITHIN_MINISTRY_90%',
-                'FUZZY_WITHIN_MINISTRY_89%',
-                'FUZZY_WITHIN_MINISTRY_88%',
-                'FUZZY_WITHIN_MINISTRY_87%',
-                'FUZZY_WITHIN_MINISTRY_86%',
-                'FUZZY_WITHIN_MINISTRY_85%',
-                'FUZZY_MATCH_100%',
-                'FUZZY_MATCH_99%',
-                'FUZZY_MATCH_98%',
-                'FUZZY_MATCH_97%',
-                'FUZZY_MATCH_96%',
-                'FUZZY_MATCH_95%',
-                'FUZZY_MATCH_94%',
-                'FUZZY_MATCH_93%',
-                'FUZZY_MATCH_92%',
-                'FUZZY_MATCH_91%',
-                'FUZZY_MATCH_90%',
-                'NO_MATCH'
-            ]
-            
-            for category in match_categories:
-                if category in match_stats:
-                    count = match_stats[category]
-                    percentage = (count / total_agencies) * 100
-                    print(f"   {category}: {count} ({percentage:.1f}%)")
+            # Best match quality first, most frequent first within a bucket
+            for category, count in sorted(
+                match_stats.items(),
+                key=lambda item: (cls._match_category_rank(item[0]), -item[1])
+            ):
+                percentage = (count / total_agencies) * 100
+                print(f"   {category}: {count} ({percentage:.1f}%)")
             
             # Calculate summary stats
             exact_matches = sum(match_stats.get(cat, 0) for cat in [
@@ -490,36 +634,31 @@ class DataCleaner:
             # 7. Insert into database
             print(f"\n💾 Inserting {len(match_results)} records into database...")
             
-            # Clear existing data first
+            # Replace existing data; the delete and the inserts commit together,
+            # so a failed load leaves the previous budget in place
+            begin_immediate()
             BudgetProject2024.query.delete()
-            db.session.commit()
             
-            inserted = 0
-            skipped = 0
+            # Plain mappings: executemany batches with no ORM objects or per-row
+            # unit-of-work bookkeeping
+            records, skipped = cls._prepare_budget_records(match_results)
+            for code, reason in skipped:
+                print(f"   Error processing record {code}: {reason}")
             
-            for record in match_results:
-                try:
-                    # Remove match_type from record before saving
-                    record.pop('match_type', None)
-                    
-                    # Create new record
-                    budget_project = BudgetProject2024(**record)
-                    db.session.add(budget_project)
-                    inserted += 1
-                        
-                except Exception as e:
-                    print(f"   Error processing record {record['code']}: {str(e)}")
-                    skipped += 1
-                    continue
+            for start in range(0, len(records), cls.INSERT_BATCH_SIZE):
+                db.session.bulk_insert_mappings(
+                    BudgetProject2024, records[start:start + cls.INSERT_BATCH_SIZE]
+                )
             
             db.session.commit()
+            inserted = len(records)
             
             # 8. Print final summary
             print(f"\n✅ Budget data ingestion complete!")
             print(f"\n📊 Final Statistics:")
             print(f"   Total records processed: {len(match_results)}")
             print(f"   Records inserted: {inserted}")
-            print(f"   Records skipped: {skipped}")
+            print(f"   Records skipped: {len(skipped)}")
             
             # 9. Save unmatched agencies for review
             if unmatched_details:
@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional, List
 from sqlalchemy import func, case, distinct
 from app.api_client import APIClient
 from app.models import SurveyResponse, SurveyMetadata, MinistryAgency, BudgetProject2024, db
+from app.database import begin_immediate
 from app.question_normalizer import extract_answer_by_normalized_text
 from app.data_cleaner import DataCleaner
 
@@ -265,7 +266,7 @@ class DataFetcher:
         """Fetch and store data for a specific survey"""
         print(f"Starting data fetch for {survey_type}...")
 
-        api_client = APIClient(survey_type)
+        api_client = APIClient.for_survey(survey_type)
         all_responses = api_client.fetch_all_responses()
 
         if not all_responses:
@@ -287,6 +288,9 @@ class DataFetcher:
 
                 processed_data = cls.process_survey_response(response, survey_type)
 
+                # Take the write lock only now that an insert is certain; the
+                # unique public_id still rejects a row stored since the check
+                begin_immediate()
                 survey_response = SurveyResponse(**processed_data)
                 db.session.add(survey_response)
                 db.session.commit()
@@ -404,41 +408,10 @@ class DataFetcher:
         print(f"  - Need to fetch {new_to_fetch} new responses")
         
         # Start fetching from where we left off
-        start_offset = existing_count
-        all_responses = []
-        
-        # Use the existing fetch_all_responses method but with custom start
-        offset = start_offset
-        limit = api_client.page_size
-        
-        while True:
-            print(f"  Fetching offset={offset}, limit={limit}")
-            response_data = api_client.fetch_responses(offset, limit)
-            
-            if not response_data.get('status'):
-                print(f"API returned error: {response_data.get('message', 'Unknown error')}")
-                break
-            
-            data = response_data.get('data', {})
-            results = data.get('results', [])
-            
-            if not results:
-                break
-            
-            all_responses.extend(results)
-            
-            # Check if we've fetched enough
-            if len(all_responses) >= new_to_fetch:
-                # Trim excess (in case last page had more than we needed)
-                all_responses = all_responses[:new_to_fetch]
-                break
-            
-            # Check if there are more pages
-            next_url = data.get('next')
-            if not next_url:
-                break
-            
-            offset += limit
+        all_responses = api_client.fetch_all_responses(
+            start_offset=existing_count,
+            max_results=new_to_fetch
+        )
         
         print(f"  ✅ Fetched {len(all_responses)} new responses")
         return all_responses
@@ -448,7 +421,7 @@ class DataFetcher:
         """Smart version using optimized pagination"""
         print(f"🚀 Starting SMART data fetch for {survey_type}...")
         
-        api_client = APIClient(survey_type)
+        api_client = APIClient.for_survey(survey_type)
         
         # Use smart pagination
         responses = cls.smart_fetch_responses(api_client, survey_type)
@@ -473,6 +446,7 @@ class DataFetcher:
                     continue
 
                 processed_data = cls.process_survey_response(response, survey_type)
+                begin_immediate()
                 survey_response = SurveyResponse(**processed_data)
                 db.session.add(survey_response)
                 db.session.commit()
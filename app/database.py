@@ -1,7 +1,11 @@
 """Database configuration and initialization with SQLite optimizations."""
+import sqlite3
+
+from flask import g
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import event, text
 from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
 
 db = SQLAlchemy()
 
@@ -13,7 +17,12 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     
     This event listener is called whenever a new database connection is created.
     It configures SQLite settings that improve performance and enable WAL mode.
+    The listener is registered on every Engine, so non-SQLite connections
+    (e.g. a DATABASE_URL pointing at Postgres) are left untouched.
     """
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    
     cursor = dbapi_conn.cursor()
     
     # Enable WAL (Write-Ahead Logging) mode for better concurrency
@@ -28,9 +37,10 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     # -64000 = 64MB cache
     cursor.execute("PRAGMA cache_size=-64000")
     
-    # Set busy timeout to 5 seconds (5000 milliseconds)
-    # This is in addition to SQLAlchemy's timeout setting
-    cursor.execute("PRAGMA busy_timeout=5000")
+    # Busy timeout: 60 seconds, matching connect_args['timeout'] in Config.
+    # This PRAGMA replaces the busy handler sqlite3.connect(timeout=...) installed,
+    # so a smaller value here would silently cut that timeout down.
+    cursor.execute("PRAGMA busy_timeout=60000")
     
     # Enable foreign key constraints
     cursor.execute("PRAGMA foreign_keys=ON")
@@ -45,12 +55,67 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     cursor.close()
 
 
+def _use_immediate_transactions(engine):
+    """
+    Let write blocks on `engine` opt in to BEGIN IMMEDIATE.
+    
+    pysqlite opens transactions lazily (DEFERRED), so two writers that both
+    read first and write later can each hold a read snapshot and then fail
+    with SQLITE_BUSY on upgrade, regardless of busy_timeout. Connections
+    carrying the `sqlite_immediate` execution option (see begin_immediate())
+    take the write lock up front, so the second writer waits in the busy
+    handler instead. All other transactions keep pysqlite's deferred BEGIN,
+    so reads never queue behind the write lock.
+    """
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        if conn.get_execution_options().get('sqlite_immediate'):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def begin_immediate(session=None):
+    """
+    Start the next transaction on `session` (default db.session) with
+    BEGIN IMMEDIATE. Call it at the top of a write block, before its first
+    query; an open read-only transaction is rolled back first.
+    """
+    session = session if session is not None else db.session()
+    if session.in_transaction():
+        if session.new or session.dirty or session.deleted:
+            raise RuntimeError("begin_immediate() called with unflushed changes pending")
+        session.rollback()
+    session.connection(execution_options={'sqlite_immediate': True})
+
+
+def get_read_session():
+    """
+    Session bound to the 'reader' engine for SELECT-only work.
+    
+    One session per app context, closed on teardown. Falls back to db.session
+    when no reader bind is configured.
+    """
+    if 'read_session' not in g:
+        engine = db.engines.get('reader')
+        if engine is None:
+            return db.session
+        g.read_session = Session(bind=engine)
+    return g.read_session
+
+
+def _close_read_session(exc=None):
+    session = g.pop('read_session', None)
+    if session is not None:
+        session.close()
+
+
 def init_db(app):
     """
     Initialize the database with the Flask app.
     
     This function should be called during app creation to set up the database.
-    It ensures the instance directory exists and creates all tables.
+    It ensures the instance directory exists. Tables are only created here when
+    AUTO_CREATE_TABLES is set; otherwise use `flask db upgrade` or
+    `flask data init-db` (followed by `flask db stamp head`).
     """
     # Ensure instance directory exists
     import os
@@ -70,8 +135,17 @@ def init_db(app):
             os.makedirs(instance_dir, exist_ok=True)
             app.logger.info(f"Database directory ensured: {instance_dir}")
     
+    app.teardown_appcontext(_close_read_session)
+    
     with app.app_context():
-        db.create_all()
+        # Write blocks on the default engine opt in to BEGIN IMMEDIATE through
+        # begin_immediate(); everything else keeps pysqlite's deferred BEGIN.
+        if db.engine.dialect.name == 'sqlite':
+            _use_immediate_transactions(db.engine)
+        
+        if app.config.get('AUTO_CREATE_TABLES', False):
+            from app import models  # noqa: F401 - registers the tables on db.metadata
+            db.create_all()
         
         # Log WAL mode status
         result = db.session.execute(text("PRAGMA journal_mode")).fetchone()
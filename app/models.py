@@ -30,6 +30,8 @@ class SurveyResponse(db.Model):
     project_categorisation = db.Column(db.String(100))  # Capital/Constituency Project
     project_name = db.Column(db.Text)
     ergp_code = db.Column(db.String(20))
+    # NULL when ergp_code is missing/blank; stored so analytics don't trim() per row
+    ergp_code_clean = db.Column(db.String(20), db.Computed("nullif(trim(ergp_code), '')", persisted=True))
     parent_ministry = db.Column(db.String(250))
     mda_name = db.Column(db.String(200))
     sub_projects = db.Column(db.Text)  # SUB-PROJECT/ACTIVITY
@@ -95,6 +97,19 @@ class SurveyResponse(db.Model):
         db.Index('idx_created_at', 'created_at'),
         db.Index('idx_ergp_code', 'ergp_code'),
         db.Index('idx_parent_ministry', 'parent_ministry'),
+        # Analytics: per-MDA aggregates over a created_at window
+        db.Index('idx_ministry_mda_created', 'parent_ministry', 'mda_name', 'created_at'),
+        # Analytics: daily activity charts filter on `updated`
+        db.Index('idx_updated', 'updated'),
+        # Compliance joins survey_responses -> ministry_agencies
+        db.Index('idx_ministry_agency_id', 'ministry_agency_id'),
+        # Latest response per MDA
+        db.Index('idx_mda_created', 'mda_name', 'created_at'),
+        # Dashboard ETag: max(updated_at)
+        db.Index('idx_updated_at', 'updated_at'),
+        # Reported-project lookups only ever want non-empty ERGP codes
+        db.Index('idx_ergp_code_nonempty', 'ergp_code',
+                 sqlite_where=db.text("ergp_code IS NOT NULL AND trim(ergp_code) <> ''")),
     )
     
     def to_dict(self, include_raw_data=False):
@@ -248,7 +263,8 @@ class BudgetProject2024(db.Model):
                  code, 
                  db.func.coalesce(agency_code, 'NULL'),
                  unique=True),
-        db.Index('idx_agency_code', 'agency_code'),
+        # Covers the per-agency COUNT(DISTINCT code) without touching the table
+        db.Index('idx_agency_code', 'agency_code', 'code'),
         db.Index('idx_ministry_code', 'ministry_code'),
         db.Index('idx_code_ministry', 'code', 'ministry_code'),
     )
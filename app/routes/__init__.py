@@ -0,0 +1,97 @@
+# app/routes/__init__.py
+"""
+Blueprints and their URL rules.
+
+View functions live in main.py / api.py / admin.py, but those modules are only
+imported the first time one of their endpoints is requested. Building the app
+(CLI commands, scheduler process, health checks) therefore never imports
+analytics, pandas or openpyxl.
+"""
+from importlib import import_module
+from flask import Blueprint
+
+
+class LazyView:
+    """View callable that imports 'module.path:func' on its first call."""
+
+    def __init__(self, import_name):
+        self.import_name = import_name
+        self.__name__ = import_name.rsplit(':', 1)[1]
+        self._view = None
+
+    def __call__(self, *args, **kwargs):
+        view = self._view
+        if view is None:
+            module_name, func_name = self.import_name.split(':')
+            view = self._view = getattr(import_module(module_name), func_name)
+        return view(*args, **kwargs)
+
+
+# (rule, "module:view", methods) - endpoint names match the view function names
+MAIN_ROUTES = [
+    ("/", "app.routes.main:index", ["GET"]),
+    ("/compliance", "app.routes.main:compliance_metrics", ["GET"]),
+]
+
+API_ROUTES = [
+    # Data Fetching Endpoints
+    ("/fetch/survey1", "app.routes.api:fetch_survey1", ["POST"]),
+    ("/fetch/survey2", "app.routes.api:fetch_survey2", ["POST"]),
+    ("/fetch/all", "app.routes.api:fetch_all_surveys", ["POST"]),
+    ("/fetch/status", "app.routes.api:get_fetch_status", ["GET"]),
+    ("/stats", "app.routes.api:get_stats", ["GET"]),
+    ("/responses", "app.routes.api:get_responses", ["GET"]),
+
+    # Compliance and Metrics Endpoints
+    ("/compliance/mda", "app.routes.api:get_mda_compliance", ["GET"]),
+    ("/compliance/mda/<agency_code>/projects", "app.routes.api:get_mda_projects", ["GET"]),
+    ("/compliance/ministry", "app.routes.api:get_ministry_compliance", ["GET"]),
+
+    # Analytics
+    ("/analytics/dashboard", "app.routes.api:analytics_dashboard", ["GET"]),
+    ("/analytics/budget-reporting", "app.routes.api:budget_reporting_overview", ["GET"]),
+    ("/analytics/weekly-activity", "app.routes.api:weekly_activity", ["GET"]),
+    ("/analytics/ministry-rankings", "app.routes.api:ministry_rankings", ["GET"]),
+
+    # Export Routes
+    ("/export/responses", "app.routes.api:export_responses", ["GET"]),
+    ("/export/responses/preview", "app.routes.api:export_preview", ["GET"]),
+    ("/export/count", "app.routes.api:export_count", ["GET"]),
+    ("/export/filters", "app.routes.api:get_export_filters", ["GET"]),
+
+    ("/api/admin/link-responses", "app.routes.api:link_survey_responses", ["POST"]),
+]
+
+ADMIN_ROUTES = [
+    # Ministry agencies
+    ("/ministry-agencies", "app.routes.admin:ministry_agencies_list", ["GET"]),
+    ("/ministry-agencies/new", "app.routes.admin:ministry_agency_create", ["GET", "POST"]),
+    ("/ministry-agencies/<int:id>/edit", "app.routes.admin:ministry_agency_edit", ["GET", "POST"]),
+    ("/ministry-agencies/<int:id>/delete", "app.routes.admin:ministry_agency_delete", ["POST"]),
+
+    # Budget projects
+    ("/budget-projects", "app.routes.admin:budget_projects_list", ["GET"]),
+    ("/budget-projects/new", "app.routes.admin:budget_project_create", ["GET", "POST"]),
+    ("/budget-projects/<int:id>/edit", "app.routes.admin:budget_project_edit", ["GET", "POST"]),
+    ("/budget-projects/<int:id>/delete", "app.routes.admin:budget_project_delete", ["POST"]),
+
+    # Survey responses
+    ("/survey-responses", "app.routes.admin:survey_responses_list", ["GET"]),
+    ("/survey-responses/<int:id>", "app.routes.admin:survey_response_view", ["GET"]),
+    ("/survey-responses/<int:id>/edit", "app.routes.admin:survey_response_edit", ["GET", "POST"]),
+
+    # JSON helpers for the admin forms
+    ("/api/ministry-agencies/search", "app.routes.admin:api_ministry_agencies_search", ["GET"]),
+    ("/api/ministry-agencies/<int:id>", "app.routes.admin:api_ministry_agency_get", ["GET"]),
+
+    ("/", "app.routes.admin:admin_home", ["GET"]),
+]
+
+
+def make_blueprint(name, routes, **kwargs):
+    """Build a blueprint whose views are resolved lazily from `routes`."""
+    bp = Blueprint(name, __name__, **kwargs)
+    for rule, import_name, methods in routes:
+        view = LazyView(import_name)
+        bp.add_url_rule(rule, endpoint=view.__name__, view_func=view, methods=methods)
+    return bp
@@ -2,21 +2,18 @@
 Admin routes for managing database entities
 Provides CRUD interfaces for MinistryAgency, BudgetProject2024, and SurveyResponse
 """
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import render_template, request, jsonify, flash, redirect, url_for
 from app.database import db
 from app.models import MinistryAgency, BudgetProject2024, SurveyResponse
 from sqlalchemy import or_, func
 from datetime import datetime
 
-admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
-
 # Feature flag for SurveyResponse editing
 ALLOW_SURVEY_EDIT = False  # Set to True to enable editing survey responses
 
 
 # ==================== MINISTRY AGENCY ADMIN ====================
 
-@admin_bp.route('/ministry-agencies')
 def ministry_agencies_list():
     """List all ministry agencies with search and pagination"""
     page = request.args.get('page', 1, type=int)
@@ -61,7 +58,6 @@ def ministry_agencies_list():
                          ministries=ministries)
 
 
-@admin_bp.route('/ministry-agencies/new', methods=['GET', 'POST'])
 def ministry_agency_create():
     """Create a new ministry agency"""
     if request.method == 'POST':
@@ -90,7 +86,6 @@ def ministry_agency_create():
     return render_template('admin/ministry_agency_form.html', ministry_agency=None)
 
 
-@admin_bp.route('/ministry-agencies/<int:id>/edit', methods=['GET', 'POST'])
 def ministry_agency_edit(id):
     """Edit an existing ministry agency"""
     ministry_agency = MinistryAgency.query.get_or_404(id)
@@ -122,7 +117,6 @@ def ministry_agency_edit(id):
     return render_template('admin/ministry_agency_form.html', ministry_agency=ministry_agency)
 
 
-@admin_bp.route('/ministry-agencies/<int:id>/delete', methods=['POST'])
 def ministry_agency_delete(id):
     """Delete a ministry agency"""
     try:
@@ -147,7 +141,6 @@ def ministry_agency_delete(id):
 
 # ==================== BUDGET PROJECT 2024 ADMIN ====================
 
-@admin_bp.route('/budget-projects')
 def budget_projects_list():
     """List all budget projects with search and pagination"""
     page = request.args.get('page', 1, type=int)
@@ -200,7 +193,6 @@ def budget_projects_list():
                          statuses=statuses)
 
 
-@admin_bp.route('/budget-projects/new', methods=['GET', 'POST'])
 def budget_project_create():
     """Create a new budget project"""
     if request.method == 'POST':
@@ -236,7 +228,6 @@ def budget_project_create():
                          ministry_agencies=ministry_agencies)
 
 
-@admin_bp.route('/budget-projects/<int:id>/edit', methods=['GET', 'POST'])
 def budget_project_edit(id):
     """Edit an existing budget project"""
     budget_project = BudgetProject2024.query.get_or_404(id)
@@ -271,7 +262,6 @@ def budget_project_edit(id):
                          ministry_agencies=ministry_agencies)
 
 
-@admin_bp.route('/budget-projects/<int:id>/delete', methods=['POST'])
 def budget_project_delete(id):
     """Delete a budget project"""
     try:
@@ -289,7 +279,6 @@ def budget_project_delete(id):
 
 # ==================== SURVEY RESPONSE ADMIN (READ-ONLY/LIMITED EDIT) ====================
 
-@admin_bp.route('/survey-responses')
 def survey_responses_list():
     """List all survey responses (read-only with optional edit)"""
     page = request.args.get('page', 1, type=int)
@@ -342,7 +331,6 @@ def survey_responses_list():
                          allow_edit=ALLOW_SURVEY_EDIT)
 
 
-@admin_bp.route('/survey-responses/<int:id>')
 def survey_response_view(id):
     """View a survey response in detail"""
     survey_response = SurveyResponse.query.get_or_404(id)
@@ -351,7 +339,6 @@ def survey_response_view(id):
                          allow_edit=ALLOW_SURVEY_EDIT)
 
 
-@admin_bp.route('/survey-responses/<int:id>/edit', methods=['GET', 'POST'])
 def survey_response_edit(id):
     """Edit limited fields of a survey response (only if flag is enabled)"""
     if not ALLOW_SURVEY_EDIT:
@@ -397,7 +384,6 @@ def survey_response_edit(id):
 
 # ==================== API ENDPOINTS FOR AJAX ====================
 
-@admin_bp.route('/api/ministry-agencies/search')
 def api_ministry_agencies_search():
     """API endpoint for searching ministry agencies (for autocomplete)"""
     query = request.args.get('q', '')
@@ -424,7 +410,6 @@ def api_ministry_agencies_search():
     } for ma in results])
 
 
-@admin_bp.route('/api/ministry-agencies/<int:id>')
 def api_ministry_agency_get(id):
     """API endpoint for getting a single ministry agency"""
     ministry_agency = MinistryAgency.query.get_or_404(id)
@@ -433,7 +418,6 @@ def api_ministry_agency_get(id):
 
 # ==================== ADMIN HOME ====================
 
-@admin_bp.route('/')
 def admin_home():
     """Admin dashboard home"""
     stats = {
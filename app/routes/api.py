@@ -1,5 +1,5 @@
 # app/routes/api.py
-from flask import Blueprint, jsonify, request, send_file, current_app
+from flask import jsonify, request, send_file, current_app
 from app import db
 from ..models import SurveyResponse, SurveyMetadata, MinistryAgency, BudgetProject2024
 from ..data_fetcher import DataFetcher
@@ -9,11 +9,8 @@ from ..scheduler import get_last_fetch_time, is_fetch_in_progress, get_next_run_
 from app.export_service import ExportService
 from datetime import datetime
 
-api_bp = Blueprint("api", __name__)
-
 
 # Data Fetching Endpoints
-@api_bp.post("/fetch/survey1")
 def fetch_survey1():
     """
     Manual API endpoint to fetch survey 1 data.
@@ -25,7 +22,6 @@ def fetch_survey1():
     }), 403
 
 
-@api_bp.post("/fetch/survey2")
 def fetch_survey2():
     """
     Manual API endpoint to fetch survey 2 data.
@@ -37,7 +33,6 @@ def fetch_survey2():
     }), 403
 
 
-@api_bp.post("/fetch/all")
 def fetch_all_surveys():
     """
     Manual API endpoint to fetch both surveys.
@@ -49,7 +44,6 @@ def fetch_all_surveys():
     }), 403
 
 
-@api_bp.get("/fetch/status")
 def get_fetch_status():
     """Get the status of the scheduled fetch operations"""
     last_fetch = get_last_fetch_time()
@@ -65,7 +59,6 @@ def get_fetch_status():
     return jsonify(status)
 
 
-@api_bp.route('/stats', methods=['GET'])
 def get_stats():
     """Get dashboard statistics"""
     try:        
@@ -91,7 +84,6 @@ def get_stats():
         }), 500
 
 
-@api_bp.get("/responses")
 def get_responses():
     # 1. Capture DataTables specific parameters
     draw = request.args.get("draw", type=int)
@@ -139,7 +131,6 @@ def get_responses():
 
 
 # Compliance and Metrics Endpoints
-@api_bp.get("/compliance/mda")
 def get_mda_compliance():
     """Returns MDA-level compliance data"""
     try:
@@ -165,7 +156,6 @@ def get_mda_compliance():
         return jsonify({"success": False, "message": str(e)}), 500
 
 
-@api_bp.get("/compliance/mda/<agency_code>/projects")
 def get_mda_projects(agency_code):
     """Get project details for a specific MDA"""
     try:
@@ -199,7 +189,6 @@ def get_mda_projects(agency_code):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@api_bp.get("/compliance/ministry")
 def get_ministry_compliance():
     """Get ministry-level compliance data"""
     try:
@@ -257,13 +246,19 @@ def get_ministry_compliance_():
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
-@api_bp.get("/analytics/dashboard")
 def analytics_dashboard():
     svc = AnalyticsService()
-    return jsonify(svc.dashboard_overview())
+
+    # Conditional GET: polling clients with a current copy skip the widget queries
+    etag = svc.dashboard_etag()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(svc.dashboard_overview())
+    response.set_etag(etag)
+    return response
 
 
-@api_bp.get("/analytics/budget-reporting")
 def budget_reporting_overview():
     """Get overview of reported vs unreported 2024 budget projects"""
     try:
@@ -280,7 +275,6 @@ def budget_reporting_overview():
         }), 500
 
 # Weekly Activity
-@api_bp.get("/analytics/weekly-activity")
 def weekly_activity():
     """Get daily response counts for the past 7 days"""
     days = request.args.get('days', default=7, type=int)
@@ -312,7 +306,6 @@ def weekly_activity():
 
 # Ministry Rankings
 
-@api_bp.get("/analytics/ministry-rankings")
 def ministry_rankings():
     """Get best and worst performing ministries grouped by parent ministry"""
     try:
@@ -384,7 +377,6 @@ def ministry_rankings():
 
 # Export Routes
 
-@api_bp.route('/export/responses', methods=['GET'])
 def export_responses():
     """
     Export survey responses to Excel
@@ -462,7 +454,6 @@ def export_responses():
         }), 500
 
 
-@api_bp.route('/export/responses/preview', methods=['GET'])
 def export_preview():
     """
     Get a preview of what will be exported (first 10 records)
@@ -505,7 +496,6 @@ def export_preview():
 
 # Add this endpoint to your routes/api.py for the export count feature (optional)
 
-@api_bp.route('/export/count', methods=['GET'])
 def export_count():
     """
     Get count of responses that would be exported with current filters
@@ -564,7 +554,6 @@ def export_count():
             'error': str(e)
         }), 500
 
-@api_bp.get("/export/filters")
 def get_export_filters():
     """Get available filter options for export modal"""
     try:
@@ -607,7 +596,6 @@ def get_export_filters():
         }), 500
     
 
-@api_bp.route('/api/admin/link-responses', methods=['POST'])
 def link_survey_responses():
     """Admin endpoint to link survey responses"""
     try:
@@ -74,6 +74,14 @@ def scheduled_fetch():
             print(f"   Completed at: {last_fetch_time}", file=sys.stderr)
             print("=" * 60 + "\n", file=sys.stderr)
             
+            # The fetch commits (clearing the analytics cache), so rebuild the
+            # aggregates here instead of on the next dashboard request
+            try:
+                from app.analytics import AnalyticsService
+                AnalyticsService().warm_cache()
+            except Exception as e:
+                logger.warning(f"Analytics cache warm-up failed: {str(e)}")
+            
             # CRITICAL: Explicitly remove all database sessions
             # This prevents connection pooling leaks
             db.session.remove()
@@ -5,8 +5,6 @@ import time
 import threading
 from flask.cli import with_appcontext
 from flask import current_app
-from app.data_cleaner import DataCleaner
-from app.models import BudgetProject2024
 from app.database import db, get_db_info
 from sqlalchemy import text
 
@@ -20,6 +18,18 @@ def db_manage():
     """Database management commands."""
     pass
 
+@data.command('init-db')
+@with_appcontext
+def init_db_tables():
+    """
+    Creates any missing database tables.
+    Run once on a fresh database, then `flask db stamp head` so later
+    `flask db upgrade` runs don't re-apply migrations to the new schema.
+    """
+    from app import models  # noqa: F401 - registers the tables on db.metadata
+    db.create_all()
+    click.echo("✅ Database tables created.")
+
 @data.command('ingest-budget')
 @click.argument('file_path')
 def ingest_budget_data(file_path):
@@ -27,6 +37,11 @@ def ingest_budget_data(file_path):
     Ingests 2024 Approved Budget data from a specified CSV file path.
     Example: flask data ingest-budget /path/to/2024_Amended.xlsx\ -\ Sheet1.csv
     """
+    # Imported here so registering the command groups in create_app()
+    # does not load pandas for every web worker.
+    from app.data_cleaner import DataCleaner
+    from app.models import BudgetProject2024
+
     # Check if the table already has data
     with current_app.app_context():
         if BudgetProject2024.query.first():
@@ -102,8 +117,9 @@ def checkpoint_wal():
     Useful for reducing WAL file size and ensuring data persistence.
     """
     try:
-        result = db.session.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).fetchone()
-        db.session.commit()
+        # Outside a transaction, or the checkpoint would be blocked by our own lock
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            result = conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).fetchone()
         
         click.echo("WAL checkpoint completed successfully")
         if result:
@@ -122,8 +138,9 @@ def enable_wal():
     but this command can be used to verify or re-enable it.
     """
     try:
-        result = db.session.execute(text("PRAGMA journal_mode=WAL")).fetchone()
-        db.session.commit()
+        # journal_mode can't be changed from within a transaction
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            result = conn.execute(text("PRAGMA journal_mode=WAL")).fetchone()
         
         if result and result[0] == 'wal':
             click.echo("✓ WAL mode enabled successfully")
@@ -155,7 +172,8 @@ def optimize_db():
         if click.confirm("Run VACUUM? (This may take time and lock the database)", default=False):
             click.echo("Running VACUUM...")
             # VACUUM cannot run in a transaction
-            db.session.execute(text("VACUUM"))
+            with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
             click.echo("✓ VACUUM completed")
         
         click.echo("Database optimization completed successfully")
@@ -39,6 +39,10 @@ def get_engine_url():
 config.set_main_option('sqlalchemy.url', get_engine_url())
 target_db = current_app.extensions['migrate'].db
 
+# Views are imported lazily, so building the app does not load the models;
+# register their tables before autogenerate compares metadata to the database
+import app.models  # noqa: F401,E402
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")